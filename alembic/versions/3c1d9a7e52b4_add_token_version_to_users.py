@@ -0,0 +1,26 @@
+"""add token_version to users
+
+Revision ID: 3c1d9a7e52b4
+Revises: 56eefdec0624
+Create Date: 2026-10-16 10:12:41.220913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d9a7e52b4'
+down_revision: Union[str, None] = '56eefdec0624'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,45 @@
+"""add hot path indexes
+
+Revision ID: 7a4e0c2d9b61
+Revises: 3c1d9a7e52b4
+Create Date: 2026-10-17 09:41:07.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4e0c2d9b61'
+down_revision: Union[str, None] = '3c1d9a7e52b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) -- keep in sync with the models' __table_args__
+INDEXES = [
+    ('ix_rfqs_port_id', 'rfqs', ['port', 'id']),
+    ('ix_orders_buyer_user_id_id', 'orders', ['buyer_user_id', 'id']),
+    ('ix_orders_vendor_user_id_id', 'orders', ['vendor_user_id', 'id']),
+    ('ix_orders_status_id', 'orders', ['status', 'id']),
+    ('ix_rfq_quotes_vendor_user_id_id', 'rfq_quotes', ['vendor_user_id', 'id']),
+    ('ix_shore_passes_crew_profile_id_created_at', 'shore_passes', ['crew_profile_id', 'created_at', 'id']),
+    ('ix_cab_bookings_crew_id_created_at', 'cab_bookings', ['crew_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so live tables aren't write-locked while the indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
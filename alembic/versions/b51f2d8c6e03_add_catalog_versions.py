@@ -0,0 +1,37 @@
+"""add catalog_versions
+
+Revision ID: b51f2d8c6e03
+Revises: 7a4e0c2d9b61
+Create Date: 2026-10-17 09:24:10.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b51f2d8c6e03'
+down_revision: Union[str, None] = '7a4e0c2d9b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        'catalog_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(table, [
+        {'name': 'pubs', 'version': 1},
+        {'name': 'hotels', 'version': 1},
+        {'name': 'restaurants', 'version': 1},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
@@ -0,0 +1,38 @@
+"""add sync_tombstones
+
+Revision ID: d8a3e6f19c42
+Revises: b51f2d8c6e03
+Create Date: 2026-10-17 11:02:37.509214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3e6f19c42'
+down_revision: Union[str, None] = 'b51f2d8c6e03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_sync_tombstones_owner_id_deleted_at', 'sync_tombstones', ['owner_id', 'deleted_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_tombstones_owner_id_deleted_at', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
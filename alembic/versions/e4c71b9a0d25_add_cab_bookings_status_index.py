@@ -0,0 +1,34 @@
+"""add cab_bookings status index
+
+Revision ID: e4c71b9a0d25
+Revises: d8a3e6f19c42
+Create Date: 2026-10-17 14:12:48.306115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c71b9a0d25'
+down_revision: Union[str, None] = 'd8a3e6f19c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # dispatch rounds: WHERE status = 'PENDING' ORDER BY created_at, id
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_cab_bookings_status_created_at', 'cab_bookings', ['status', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_cab_bookings_status_created_at', table_name='cab_bookings',
+            postgresql_concurrently=True, if_exists=True,
+        )
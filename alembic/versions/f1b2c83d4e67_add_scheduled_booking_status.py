@@ -0,0 +1,34 @@
+"""add scheduled booking status
+
+Revision ID: f1b2c83d4e67
+Revises: e4c71b9a0d25
+Create Date: 2026-10-17 16:40:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b2c83d4e67'
+down_revision: Union[str, None] = 'e4c71b9a0d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # a new enum value can only be used once the ALTER has committed
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE bookingstatus ADD VALUE IF NOT EXISTS 'SCHEDULED' BEFORE 'PENDING'")
+    # future bookings already waiting as PENDING: the scheduler promotes them
+    # back at their lead time (those already inside it on startup)
+    op.execute(
+        "UPDATE cab_bookings SET status = 'SCHEDULED' "
+        "WHERE status = 'PENDING' AND scheduled_time > (now() AT TIME ZONE 'utc')"
+    )
+
+
+def downgrade() -> None:
+    # Postgres cannot drop an enum value; the type keeps 'SCHEDULED' unused
+    op.execute("UPDATE cab_bookings SET status = 'PENDING' WHERE status = 'SCHEDULED'")
@@ -0,0 +1,47 @@
+# app/api/v1/conditional.py
+"""
+ETag / If-None-Match helpers for detail endpoints.
+
+Tags are weak (W/"...") because they are derived from row versions, not
+from the serialized bytes, which depend on encoding negotiation. Endpoints
+that only need a version to build the tag check `has_conditional()` first
+and, when the client sent If-None-Match, look up just those columns so a
+304 costs no row load and no serialization.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"  # always revalidate, never serve stale
+
+
+def weak_etag(*parts) -> str:
+    raw = ":".join(str(p) for p in parts)
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+def has_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (t[2:] if t.startswith("W/") else t) == opaque
+        for t in (part.strip() for part in header.split(","))
+    )
+
+
+def not_modified(etag: str, cache_control: str = CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_etag(response: Response, etag: str, cache_control: str = CACHE_CONTROL) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
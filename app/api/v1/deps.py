@@ -1,21 +1,78 @@
+# app/api/v1/deps.py
+import hmac
 from typing import Optional
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models.user import User
-from app.services.auth import decode_subject 
-
 
 from fastapi import Depends, Header, HTTPException, status
-# ... existing imports ...
-
-def get_current_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    token = authorization.split()[1]
-    email = decode_subject(token)
-    if not email:
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.services.auth import decode_claims, has_claims
+from app.services.principals import (
+    Principal,
+    is_token_current,
+    load_principal,
+)
+
+# Reads "Authorization: Bearer <token>" and makes Swagger show a lock icon.
+# auto_error=False so we control the 401 body ourselves.
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
+
+
+def _verified_payload(token: Optional[str]) -> dict:
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
+    payload = decode_claims(token)
+    if not payload or not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+    return payload
+
+
+async def get_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """
+    Shared auth dependency for every router (async, so it never occupies a
+    threadpool slot, even for sync endpoints).
+
+    Resolves the Bearer token to a cached `Principal`; the users table is only
+    queried when the principal is not already in the per-process cache.
+    """
+    payload = _verified_payload(token)
+    principal = await load_principal(db, payload["sub"])
+    if not principal:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    if payload.get("ver") is not None and int(payload["ver"]) != principal.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return principal
+
+
+async def get_current_claims(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """
+    Lighter auth dependency for endpoints that only need `id` and `role`.
+
+    Claims tokens (uid/role/ver) are authorized from the verified payload plus
+    a cached token_version check; the returned principal has no profile
+    fields. Older subject-only tokens fall back to `get_current_user`.
+    """
+    payload = _verified_payload(token)
+    if not has_claims(payload):
+        return await get_current_user(token=token, db=db)
+    if not await is_token_current(db, payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return Principal.from_claims(payload)
+
+
+def require_internal_token(x_internal_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for ops-only endpoints. They stay hidden (404) unless
+    INTERNAL_API_TOKEN is configured and presented in X-Internal-Token.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected or not x_internal_token or not hmac.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
@@ -0,0 +1,41 @@
+# app/api/v1/nearby.py
+"""
+`near=lat,lng&radius=<km>&k=<n>` query parameters shared by the catalog lists.
+
+- near + radius      -> everything within radius km, closest first
+- near + k           -> the k closest
+- near + radius + k  -> the k closest within radius km
+- near alone         -> the DEFAULT_K closest
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from app.services.catalog_cache import NearQuery
+
+DEFAULT_K = 20
+MAX_K = 200
+MAX_RADIUS_KM = 200.0
+
+
+def near_params(
+    near: Optional[str] = Query(default=None, description="lat,lng"),
+    radius: Optional[float] = Query(default=None, gt=0, le=MAX_RADIUS_KM, description="km"),
+    k: Optional[int] = Query(default=None, ge=1, le=MAX_K),
+) -> Optional[NearQuery]:
+    if near is None:
+        if radius is not None or k is not None:
+            raise HTTPException(status_code=400, detail="radius and k require near=lat,lng")
+        return None
+
+    try:
+        lat_s, lng_s = near.split(",")
+        lat, lng = float(lat_s), float(lng_s)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="near must be 'lat,lng'")
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        raise HTTPException(status_code=400, detail="near is out of range")
+
+    if radius is None and k is None:
+        k = DEFAULT_K
+    return NearQuery(lat=lat, lng=lng, radius_km=radius, k=k)
@@ -0,0 +1,140 @@
+# app/api/v1/pagination.py
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Contract for every paginated endpoint:
+  ?limit=<1..200, default 50>&cursor=<opaque string from the previous page>
+  -> {"items": [...], "next_cursor": "<string>" | null}
+
+Lists are newest-first. Cursors encode the sort key of the last row
+returned, so pages stay stable while new rows are inserted and each page
+is an index range scan regardless of history size.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+
+T = TypeVar("T")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    """Query-string dependency: `params: PageParams = Depends()`."""
+
+    def __init__(
+        self,
+        limit: int = Query(default=DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = Query(default=None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+# -------- cursor encoding --------
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, arity: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != arity:
+            raise ValueError(cursor)
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _cursor_id(value: Any) -> int:
+    # ids are encoded as JSON integers; anything else was not issued by us
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+# -------- statement helpers --------
+def keyset_by_id(stmt, id_col, params: PageParams):
+    """Newest-first by primary key."""
+    if params.cursor:
+        (last_id,) = decode_cursor(params.cursor, 1)
+        stmt = stmt.where(id_col < _cursor_id(last_id))
+    return stmt.order_by(id_col.desc()).limit(params.limit + 1)
+
+
+def keyset_by_created(stmt, created_col, id_col, params: PageParams):
+    """Newest-first by (created_at, id); id breaks ties between equal timestamps."""
+    if params.cursor:
+        last_created, last_id = decode_cursor(params.cursor, 2)
+        try:
+            last_created = datetime.fromisoformat(last_created)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(created_col, id_col) < tuple_(last_created, _cursor_id(last_id)))
+    return stmt.order_by(created_col.desc(), id_col.desc()).limit(params.limit + 1)
+
+
+def build_page(
+    rows: Sequence[Any],
+    params: PageParams,
+    cursor_key: Callable[[Any], tuple],
+    serialize: Optional[Callable[[Any], Any]] = None,
+) -> dict:
+    """
+    Turn the `limit + 1` rows fetched by a keyset statement into a page.
+
+    Returns a plain dict so FastAPI validates it against `Page[...]` exactly once.
+    """
+    has_more = len(rows) > params.limit
+    rows = list(rows[: params.limit])
+    next_cursor = encode_cursor(*cursor_key(rows[-1])) if has_more and rows else None
+    items = [serialize(r) for r in rows] if serialize else rows
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def slice_page(
+    items: Sequence[Any],
+    params: PageParams,
+    serialize: Optional[Callable[[Any], Any]] = None,
+) -> dict:
+    """
+    Page over a result list already ranked in memory (e.g. search hits).
+
+    There is no stable sort key to seek on, so the cursor carries an offset.
+    """
+    start = 0
+    if params.cursor:
+        (start,) = decode_cursor(params.cursor, 1)
+        if not isinstance(start, int) or start < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    end = start + params.limit
+    chunk = items[start:end]
+    return {
+        "items": [serialize(i) for i in chunk] if serialize else list(chunk),
+        "next_cursor": encode_cursor(end) if end < len(items) else None,
+    }
+
+
+def empty_page() -> dict:
+    return {"items": [], "next_cursor": None}
+
+
+def by_id(row) -> tuple:
+    return (row.id,)
+
+
+def by_created(row) -> tuple:
+    return (row.created_at, row.id)
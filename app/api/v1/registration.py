@@ -1,5 +1,5 @@
-from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.orm import Session
 from datetime import date
@@ -7,9 +7,9 @@ from datetime import date
 from app.db.session import get_db
 from app.db.models.user import User
 from app.db.models.crew_profile import CrewProfile
-from app.services.auth import get_password_hash, create_access_token
-from app.core.config import settings
-from app.api.v1.routes_auth import AuthOut
+from app.services.auth import issue_access_token
+from app.services.password_hashing import hash_password
+from app.api.v1.routes_auth import AuthOut, get_user_by_email
 
 router = APIRouter()
 
@@ -26,20 +26,13 @@ class CrewRegistrationIn(BaseModel):
     passport_number: str
     date_of_birth: date
 
-@router.post("/crew", response_model=AuthOut, status_code=status.HTTP_201_CREATED)
-def register_crew(body: CrewRegistrationIn, db: Session = Depends(get_db)):
-    email = body.email.lower().strip()
-
-    # Check if user already exists
-    if db.query(User).filter(User.email == email).first():
-        raise HTTPException(status_code=409, detail="Email already registered")
-
+def _create_crew_user(db: Session, body: CrewRegistrationIn, email: str, hashed_password: str) -> User:
     # 1. Create User
     user = User(
         name=body.full_name,
         email=email,
         mobile_number=body.mobile_number,
-        hashed_password=get_password_hash(body.password),
+        hashed_password=hashed_password,
         role="crew"
     )
     db.add(user)
@@ -63,11 +56,21 @@ def register_crew(body: CrewRegistrationIn, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
     db.refresh(user)
+    return user
+
+# async so bcrypt runs on the dedicated hashing executor (see routes_auth)
+@router.post("/crew", response_model=AuthOut, status_code=status.HTTP_201_CREATED)
+async def register_crew(body: CrewRegistrationIn, db: Session = Depends(get_db)):
+    email = body.email.lower().strip()
+
+    # Check if user already exists
+    if await run_in_threadpool(get_user_by_email, db, email):
+        raise HTTPException(status_code=409, detail="Email already registered")
+
+    hashed = await hash_password(body.password)
+    user = await run_in_threadpool(_create_crew_user, db, body, email, hashed)
 
     # 3. Issue Token
-    token = create_access_token(
-        subject=user.email,
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-    )
+    token = issue_access_token(user)
     
     return AuthOut(access_token=token, role=user.role)
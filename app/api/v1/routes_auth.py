@@ -1,4 +1,3 @@
-from datetime import timedelta
 from typing import Optional
 
 from fastapi import (
@@ -6,57 +5,22 @@ from fastapi import (
     Depends,
     HTTPException,
     status,
-    Header,
 )
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy.orm import Session
 
+from app.api.v1.deps import get_current_user
 from app.db.session import get_db
     # ensure these models are imported so relationships are configured
 from app.db.models.user import User
-from app.services.auth import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
-    decode_subject,
-)
-from app.core.config import settings
+from app.services.auth import issue_access_token
+from app.services.password_hashing import check_password, hash_password
+from app.services.principals import Principal
 
 router = APIRouter()
 
 
-# ----------------------------
-# Auth helpers / dependencies
-# ----------------------------
-def get_current_user(
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None),
-) -> User:
-    """
-    Extract current user from Bearer token in the Authorization header.
-    """
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing bearer token",
-        )
-    token = authorization.split(" ", 1)[1].strip()
-    email = decode_subject(token)
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-        )
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    return user
-
-
 # ----------------------------
 # Schemas
 # ----------------------------
@@ -82,41 +46,59 @@ class AuthOut(BaseModel):
 # ----------------------------
 # Auth routes
 # ----------------------------
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+# signup/login are async so that bcrypt runs on the dedicated hashing executor
+# and DB calls use the threadpool only for as long as the query takes.
 @router.post("/signup", response_model=AuthOut, status_code=status.HTTP_201_CREATED)
-def signup(body: SignupIn, db: Session = Depends(get_db)):
+async def signup(body: SignupIn, db: Session = Depends(get_db)):
     email = body.email.lower().strip()
 
     # enforce uniqueness
-    if db.query(User).filter(User.email == email).first():
+    if await run_in_threadpool(get_user_by_email, db, email):
         raise HTTPException(status_code=409, detail="Email already registered")
 
     user = User(
         name=(body.name or "").strip() or None,
         email=email,
-        hashed_password=get_password_hash(body.password),
+        hashed_password=await hash_password(body.password),
         role=body.role,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_threadpool(_save_user, db, user)
 
     # ⬇️ issue token immediately so user can continue onboarding
-    token = create_access_token(
-        subject=user.email,
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-    )
+    token = issue_access_token(user)
     return AuthOut(access_token=token, role=user.role)
 
 
 @router.post("/login", response_model=AuthOut)
-def login(body: LoginIn, db: Session = Depends(get_db)):
+async def login(body: LoginIn, db: Session = Depends(get_db)):
     email = body.email.lower().strip()
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(body.password, user.hashed_password):
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user or not await check_password(body.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token(
-        subject=user.email,
-        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-    )
+    token = issue_access_token(user)
     return AuthOut(access_token=token, role=user.role)
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    db: Session = Depends(get_db),
+    me: Principal = Depends(get_current_user),
+):
+    """Revoke every token issued to the caller so far (claims tokens only)."""
+    user = db.get(User, me.id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
@@ -0,0 +1,77 @@
+# app/api/v1/routes_bundles.py
+import gzip
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api.v1.conditional import etag_matches, not_modified
+from app.api.v1.deps import get_current_claims
+from app.core.compression import accepts_encoding, no_compression
+from app.db.session import get_read_db
+from app.services.port_bundles import bundle_store
+from app.services.principals import Principal
+
+router = APIRouter()
+
+
+class BundleInfo(BaseModel):
+    port: str
+    slug: str
+    etag: str
+    size: int
+    rows: int
+    url: str
+
+
+@router.get("/", response_model=List[BundleInfo])
+def list_bundles(
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_claims),
+):
+    """Available port bundles; clients re-download a port when its etag changes."""
+    return [
+        {
+            "port": b.port,
+            "slug": slug,
+            "etag": b.etag,
+            "size": b.size,
+            "rows": b.rows,
+            "url": f"/api/v1/bundles/{slug}",
+        }
+        for slug, b in sorted(bundle_store.ensure_current(db).items())
+    ]
+
+
+@router.get("/{slug}")
+@no_compression  # stored gzip'd already
+def get_bundle(
+    slug: str,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_claims),
+):
+    """
+    One port's offline guide (catalog rows + search and spatial indexes),
+    sent as the stored gzip file. Strong ETag; If-None-Match answers 304.
+    """
+    bundle = bundle_store.ensure_current(db).get(slug)
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Unknown port")
+
+    gzipped = accepts_encoding(request.headers.get("accept-encoding", ""), "gzip")
+    # the identity representation has different bytes, so its own strong tag
+    etag = bundle.etag if gzipped else bundle.etag[:-1] + '-identity"'
+    cache_control = "public, max-age=300"
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+    data = bundle_store.read(bundle)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    else:
+        data = gzip.decompress(data)
+    return Response(content=data, media_type="application/json", headers=headers)
@@ -1,19 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+import logging
 import uuid
 
-from app.db.session import get_db
-from app.db.models.user import User
+from app.db.session import get_async_db, get_async_read_db
 from app.db.models.crew_profile import CrewProfile
 from app.db.models.shore_pass import ShorePass
 from app.db.models.cab_booking import CabBooking
-from app.db.models.cab_pricing import CabPricing
-from app.api.v1.routes_auth import get_current_user
-from pydantic import BaseModel
+from app.db.models.sync_tombstone import SyncTombstone
+from app.core.config import settings
+from app.api.v1.deps import get_current_user
+from app.api.v1.pagination import (
+    Page, PageParams, build_page, by_created, decode_cursor, empty_page, encode_cursor, keyset_by_created,
+)
+from app.services.catalog_cache import snapshot_all
+from app.services.fares import issue_fare_token, price_matrix, pricing_cache, quote_matches, verify_fare_token
+from app.services.principals import Principal
+from app.services.routing import road_router
+from app.services.scheduler import initial_status, schedule_notification
+from pydantic import BaseModel, Field
 
 router = APIRouter()
+logger = logging.getLogger("app.fares")
 
 class ProfileUpdateIn(BaseModel):
     full_name: Optional[str] = None
@@ -61,8 +73,12 @@ class CabBookingCreateIn(BaseModel):
     drop_lng: float
     vehicle_type: str  # 'ac', 'premium', 'xl'
     vehicle_name: str
-    estimated_price: float
-    distance_km: float
+    # fare_token from /cab/estimate: price and distance are taken from it.
+    # Only with CAB_FARE_TOKEN_REQUIRED=false (older clients) may it be left
+    # out, and estimated_price/distance_km are then stored as sent.
+    fare_token: Optional[str] = None
+    estimated_price: Optional[float] = None
+    distance_km: Optional[float] = None
     num_passengers: int = 1
     crew_member_ids: Optional[List[str]] = None  # List of HeyPorts IDs
     scheduled_time: Optional[datetime] = None
@@ -110,14 +126,43 @@ class CabEstimate(BaseModel):
     name: str
     estimated_price: float
     distance_km: float
+    duration_min: float
+    route_exact: bool  # False: no road route found, distance is a straight-line estimate
+    base_fare: float
+    per_km_rate: float
+    fare_token: str  # pass to /cab/book; valid for FARE_TOKEN_TTL_SECONDS
+
+class CabPairIn(BaseModel):
+    pickup_lat: float
+    pickup_lng: float
+    drop_lat: float
+    drop_lng: float
+
+class CabEstimateBatchIn(BaseModel):
+    pairs: List[CabPairIn] = Field(min_length=1, max_length=1000)
+
+class CabVehicleOut(BaseModel):
+    vehicle_type: str
+    name: str
     base_fare: float
     per_km_rate: float
+    minimum_fare: float
+
+class CabPairEstimate(BaseModel):
+    distance_km: float
+    duration_min: float
+    route_exact: bool
+    prices: List[float]  # aligned with CabEstimateBatchOut.vehicles
+
+class CabEstimateBatchOut(BaseModel):
+    vehicles: List[CabVehicleOut]
+    results: List[CabPairEstimate]  # same order as the request pairs
 
 @router.patch("/profile", response_model=dict)
-def update_crew_profile(
+async def update_crew_profile(
     body: ProfileUpdateIn,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "crew":
         raise HTTPException(
@@ -125,7 +170,7 @@ def update_crew_profile(
             detail=f"Only crew can update crew profile. Your role: '{current_user.role}'"
         )
     
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     
@@ -135,19 +180,19 @@ def update_crew_profile(
         setattr(profile, field, value)
     
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
     return {"message": "Profile updated successfully"}
 
 @router.get("/profile", response_model=CrewProfileOut)
-def get_crew_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_crew_profile(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     return profile
@@ -157,10 +202,10 @@ class GenerateShorePassIn(BaseModel):
     vessel_name: Optional[str] = None
 
 @router.post("/generate-shorepass", response_model=ShorePassOut)
-def generate_shorepass(
+async def generate_shorepass(
     body: GenerateShorePassIn = GenerateShorePassIn(),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "crew":
         raise HTTPException(
@@ -168,7 +213,7 @@ def generate_shorepass(
             detail=f"Only crew can generate shore pass. Your role: '{current_user.role}'"
         )
     
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     
@@ -204,62 +249,89 @@ def generate_shorepass(
     
     db.add(new_pass)
     try:
-        db.commit()
-        db.refresh(new_pass)
+        await db.commit()
+        await db.refresh(new_pass)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
     return new_pass
 
 @router.get("/shorepass", response_model=Optional[ShorePassOut])
-def get_current_shorepass(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_current_shorepass(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         return None
     
     # Get the latest shore pass
-    last_pass = db.query(ShorePass).filter(ShorePass.crew_profile_id == profile.id).order_by(ShorePass.created_at.desc()).first()
+    last_pass = await db.scalar(select(ShorePass).where(ShorePass.crew_profile_id == profile.id).order_by(ShorePass.created_at.desc()).limit(1))
     return last_pass
 
-@router.get("/shorepass/history", response_model=List[ShorePassOut])
-def get_shorepass_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/shorepass/history", response_model=Page[ShorePassOut])
+async def get_shorepass_history(
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all shore passes for the current user (newest first)"""
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    """Get shore passes for the current user (newest first, paginated)"""
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
-        return []
-    
-    passes = db.query(ShorePass).filter(
-        ShorePass.crew_profile_id == profile.id
-    ).order_by(ShorePass.created_at.desc()).all()
-    return passes
+        return empty_page()
+    
+    passes = (await db.scalars(keyset_by_created(
+        select(ShorePass).where(ShorePass.crew_profile_id == profile.id),
+        ShorePass.created_at, ShorePass.id, params,
+    ))).all()
+    return build_page(passes, params, by_created)
+
+def _booking_fare(body: CabBookingCreateIn):
+    """(price, distance_km) to store for a booking."""
+    if body.fare_token is None:
+        if settings.CAB_FARE_TOKEN_REQUIRED:
+            raise HTTPException(status_code=400, detail="fare_token is required; get one from /cab/estimate")
+        if body.estimated_price is None or body.distance_km is None:
+            raise HTTPException(status_code=400, detail="estimated_price and distance_km are required without fare_token")
+        logger.warning(
+            "unsigned cab booking: storing client price %s for %s km (%s)",
+            body.estimated_price, body.distance_km, body.vehicle_type,
+        )
+        return body.estimated_price, body.distance_km
+
+    quote = verify_fare_token(body.fare_token)
+    if quote is None:
+        raise HTTPException(status_code=400, detail="Fare quote is invalid or expired; request a new estimate")
+    if not quote_matches(quote, body.vehicle_type, (body.pickup_lat, body.pickup_lng), (body.drop_lat, body.drop_lng)):
+        raise HTTPException(status_code=400, detail="Fare quote does not match this trip")
+    return quote.price, quote.distance_km
 
 @router.post("/cab/book", response_model=CabBookingCreateOut)
-def book_cab(
+async def book_cab(
     body: CabBookingCreateIn,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    # the signed quote is checked before anything else: no DB read, no route search
+    price, distance = _booking_fare(body)
+
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     
     # Generate booking ID: CAB-XXXXXXXX
     booking_id = f"CAB-{uuid.uuid4().hex[:8].upper()}"
     
-    print(f"DEBUG: Receiving booking with price: {body.estimated_price}")
-    
     # Generate 4-digit OTP
     import random
     otp = f"{random.randint(0, 9999):04d}"
     
     from app.db.models.cab_booking import VehicleType, BookingStatus
+    scheduled_time = body.scheduled_time
+    if scheduled_time is not None and scheduled_time.tzinfo is not None:
+        # stored naive, in UTC like every other timestamp
+        scheduled_time = scheduled_time.astimezone(timezone.utc).replace(tzinfo=None)
     new_booking = CabBooking(
         booking_id=booking_id,
         crew_id=profile.id,
@@ -271,24 +343,28 @@ def book_cab(
         drop_lng=body.drop_lng,
         vehicle_type=VehicleType(body.vehicle_type),
         vehicle_name=body.vehicle_name,
-        estimated_price=body.estimated_price,
-        distance_km=body.distance_km,
+        estimated_price=price,
+        distance_km=distance,
         num_passengers=body.num_passengers,
         crew_member_ids=body.crew_member_ids,
-        scheduled_time=body.scheduled_time,
+        scheduled_time=scheduled_time,
         otp=otp,
         driver_name=None,
         driver_phone=None,
         agent_number="+91 9876543251",
-        status=BookingStatus.PENDING
+        status=initial_status(scheduled_time)
     )
     
     db.add(new_booking)
     try:
-        db.commit()
-        db.refresh(new_booking)
+        if new_booking.status == BookingStatus.SCHEDULED:
+            # the scheduler leader learns about it on commit, no table polling
+            await db.flush()
+            await db.execute(schedule_notification(new_booking.id, scheduled_time))
+        await db.commit()
+        await db.refresh(new_booking)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     
     return CabBookingCreateOut(
@@ -298,11 +374,26 @@ def book_cab(
         agent_number=new_booking.agent_number
     )
 
+def _booking_out(booking: CabBooking) -> CabBookingOut:
+    return CabBookingOut(
+        id=booking.id,
+        booking_id=booking.booking_id,
+        pickup_address=booking.pickup_address,
+        drop_address=booking.drop_address,
+        vehicle_type=booking.vehicle_type.value,
+        vehicle_name=booking.vehicle_name,
+        estimated_price=float(booking.estimated_price),
+        num_passengers=booking.num_passengers,
+        status=booking.status.value,
+        scheduled_time=booking.scheduled_time,
+        created_at=booking.created_at
+    )
+
 # Duplicate route removed/commented out
 # @router.get("/cab/history", response_model=List[CabBookingOut])
 # def get_cab_history(
 #     db: Session = Depends(get_db),
-#     current_user: User = Depends(get_current_user)
+#     current_user: Principal = Depends(get_current_user)
 # ):
 #     profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
 #     if not profile:
@@ -312,75 +403,95 @@ def book_cab(
 #     return history
 
 @router.get("/cab/estimate", response_model=List[CabEstimate])
-def get_cab_estimates(
+async def get_cab_estimates(
     pickup_lat: float,
     pickup_lng: float,
     drop_lat: float,
     drop_lng: float,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Mock distance calculation (Euclidean * 111 for rough km)
-    # Ideally replace this with a call to Ola Maps Directions API
-    distance = ((pickup_lat - drop_lat)**2 + (pickup_lng - drop_lng)**2)**0.5 * 111
-    
-    pricings = db.query(CabPricing).all()
-    
-    # If table is empty, return default pricing
-    if not pricings:
-        # Seed values for initial run if empty
-        default_pricings = [
-            {"type": "ac", "name": "Cab AC", "base": 50, "rate": 15, "min": 100},
-            {"type": "premium", "name": "Cab Premium AC", "base": 80, "rate": 22, "min": 180},
-            {"type": "xl", "name": "Cab XL AC", "base": 120, "rate": 30, "min": 250},
-        ]
-        res = []
-        for dp in default_pricings:
-            est_price = dp["base"] + (distance * dp["rate"])
-            final_price = max(est_price, dp["min"])
-            res.append(CabEstimate(
-                vehicle_type=dp["type"],
-                name=dp["name"],
-                estimated_price=round(final_price, 2),
-                distance_km=round(distance, 2),
-                base_fare=float(dp["base"]),
-                per_km_rate=float(dp["rate"])
-            ))
-        return res
+    # fastest road route over the offline graph (cached per road-node pair);
+    # a cache miss is a CPU-bound search and the first call loads the graph,
+    # so keep it off the event loop
+    route = await run_in_threadpool(road_router.route, pickup_lat, pickup_lng, drop_lat, drop_lng)
+    table = await db.run_sync(pricing_cache.table)
 
     estimates = []
-    for p in pricings:
-        est_price = p.base_fare + (distance * p.per_km_rate)
-        final_price = max(est_price, p.minimum_fare)
+    for i in range(len(table)):
+        price = table.price(i, route.distance_km)
         estimates.append(CabEstimate(
-            vehicle_type=p.vehicle_type,
-            name=p.vehicle_type, # Or add a 'name' field to model if needed
-            estimated_price=round(final_price, 2),
-            distance_km=round(distance, 2),
-            base_fare=p.base_fare,
-            per_km_rate=p.per_km_rate
+            vehicle_type=table.vehicle_types[i],
+            name=table.names[i],
+            estimated_price=price,
+            distance_km=round(route.distance_km, 2),
+            duration_min=round(route.duration_min, 1),
+            route_exact=route.exact,
+            base_fare=table.base_fare[i],
+            per_km_rate=table.per_km_rate[i],
+            fare_token=issue_fare_token(
+                table.vehicle_types[i], (pickup_lat, pickup_lng), (drop_lat, drop_lng), price, route.distance_km
+            ),
         ))
     return estimates
 
-    return {"message": "Booking cancelled successfully", "booking_id": booking_id}
+@router.post("/cab/estimate/batch", response_model=CabEstimateBatchOut)
+async def get_cab_estimates_batch(
+    body: CabEstimateBatchIn,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Estimates for up to 1000 pickup/drop pairs in one call. Prices come back
+    column-wise: `results[n].prices[i]` is the fare of `vehicles[i]`.
+    No fare tokens here: book from a single /cab/estimate.
+    """
+    table = await db.run_sync(pricing_cache.table)
+    # uncached road searches are CPU work: keep them off the event loop
+    routes = await run_in_threadpool(
+        road_router.route_many,
+        [(p.pickup_lat, p.pickup_lng, p.drop_lat, p.drop_lng) for p in body.pairs],
+    )
+    prices = price_matrix(table, [r.distance_km for r in routes])
+
+    return {
+        "vehicles": [
+            {
+                "vehicle_type": table.vehicle_types[i],
+                "name": table.names[i],
+                "base_fare": table.base_fare[i],
+                "per_km_rate": table.per_km_rate[i],
+                "minimum_fare": table.minimum_fare[i],
+            }
+            for i in range(len(table))
+        ],
+        "results": [
+            {
+                "distance_km": round(r.distance_km, 2),
+                "duration_min": round(r.duration_min, 1),
+                "route_exact": r.exact,
+                "prices": [column[n] for column in prices],
+            }
+            for n, r in enumerate(routes)
+        ],
+    }
 
 @router.get("/cab/bookings/{booking_id}", response_model=CabBookingDetailsOut)
-def get_booking_details(
+async def get_booking_details(
     booking_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get detailed information about a specific booking"""
     if current_user.role != "crew":
         raise HTTPException(status_code=403, detail="Only crew can view bookings")
     
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     
-    booking = db.query(CabBooking).filter(
+    booking = await db.scalar(select(CabBooking).where(
         CabBooking.booking_id == booking_id,
         CabBooking.crew_id == profile.id
-    ).first()
+    ))
     
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -400,23 +511,23 @@ def get_booking_details(
     )
 
 @router.put("/cab/bookings/{booking_id}/cancel")
-def cancel_booking(
+async def cancel_booking(
     booking_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Cancel a cab booking"""
     if current_user.role != "crew":
         raise HTTPException(status_code=403, detail="Only crew can cancel bookings")
     
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     
-    booking = db.query(CabBooking).filter(
+    booking = await db.scalar(select(CabBooking).where(
         CabBooking.booking_id == booking_id,
         CabBooking.crew_id == profile.id
-    ).first()
+    ))
     
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -431,43 +542,136 @@ def cancel_booking(
     booking.status = BookingStatus.CANCELLED
     
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to cancel booking: {str(e)}")
     
     return {"message": "Booking cancelled successfully", "booking_id": booking_id}
 
-@router.get("/cab/history", response_model=List[CabBookingOut])
-def get_booking_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/cab/history", response_model=Page[CabBookingOut])
+async def get_booking_history(
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all cab bookings for the current user"""
+    """Get cab bookings for the current user (newest first, paginated)"""
     if current_user.role != "crew":
         raise HTTPException(status_code=403, detail="Only crew can view booking history")
     
-    profile = db.query(CrewProfile).filter(CrewProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
     if not profile:
         raise HTTPException(status_code=404, detail="Crew profile not found")
     
-    bookings = db.query(CabBooking).filter(
-        CabBooking.crew_id == profile.id
-    ).order_by(CabBooking.created_at.desc()).all()
+    bookings = (await db.scalars(keyset_by_created(
+        select(CabBooking).where(CabBooking.crew_id == profile.id),
+        CabBooking.created_at, CabBooking.id, params,
+    ))).all()
     
-    return [
-        CabBookingOut(
-            id=booking.id,
-            booking_id=booking.booking_id,
-            pickup_address=booking.pickup_address,
-            drop_address=booking.drop_address,
-            vehicle_type=booking.vehicle_type.value,
-            vehicle_name=booking.vehicle_name,
-            estimated_price=float(booking.estimated_price),
-            num_passengers=booking.num_passengers,
-            status=booking.status.value,
-            scheduled_time=booking.scheduled_time,
-            created_at=booking.created_at
-        )
-        for booking in bookings
-    ]
+    return build_page(bookings, params, by_created, _booking_out)
+
+
+# ---------------- Delta sync ----------------
+class ShorePassChanges(BaseModel):
+    upserts: List[ShorePassOut] = []
+    deletes: List[int] = []
+
+class CabBookingChanges(BaseModel):
+    upserts: List[CabBookingOut] = []
+    deletes: List[int] = []
+
+class CrewSyncOut(BaseModel):
+    cursor: str
+    full: bool
+    # sections are omitted when nothing changed
+    profile: Optional[CrewProfileOut] = None
+    shore_passes: Optional[ShorePassChanges] = None
+    cab_bookings: Optional[CabBookingChanges] = None
+    # catalog name -> complete row list, sent only when that catalog changed
+    catalogs: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+
+def _parse_sync_cursor(cursor: Optional[str], now: datetime):
+    """-> (since or None for a full sync, catalog versions the client holds)"""
+    if not cursor:
+        return None, {}
+    since_raw, versions = decode_cursor(cursor, 2)
+    try:
+        since = datetime.fromisoformat(since_raw)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if since.tzinfo is None or not isinstance(versions, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        return None, {}
+    return since, versions
+
+
+@router.get("/sync", response_model=CrewSyncOut, response_model_exclude_none=True)
+async def sync(
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Everything that changed for this crew member since `cursor`: profile,
+    shore passes, cab bookings (upserts + deleted ids) and any catalog whose
+    version moved. Omit `cursor` for a full snapshot; store the returned
+    `cursor` for the next call. Upserts are idempotent: the cursor overlaps
+    the previous window by SYNC_OVERLAP_SECONDS, so a row may come twice.
+
+    Reads the primary: a lagging replica could hide rows behind the cursor.
+    """
+    if current_user.role != "crew":
+        raise HTTPException(status_code=403, detail="Only crew can sync")
+
+    now = datetime.now(timezone.utc)
+    since, client_versions = _parse_sync_cursor(cursor, now)
+
+    profile = await db.scalar(select(CrewProfile).where(CrewProfile.user_id == current_user.id))
+    if not profile:
+        raise HTTPException(status_code=404, detail="Crew profile not found")
+
+    out: Dict[str, Any] = {"full": since is None}
+
+    if since is None or (profile.updated_at or profile.created_at) > since:
+        out["profile"] = profile
+
+    passes_q = select(ShorePass).where(ShorePass.crew_profile_id == profile.id)
+    # cab_bookings timestamps are naive UTC
+    bookings_q = select(CabBooking).where(CabBooking.crew_id == profile.id)
+    deleted: Dict[str, List[int]] = {ShorePass.__tablename__: [], CabBooking.__tablename__: []}
+    if since is not None:
+        passes_q = passes_q.where(func.coalesce(ShorePass.updated_at, ShorePass.created_at) > since)
+        bookings_q = bookings_q.where(CabBooking.updated_at > since.replace(tzinfo=None))
+        for table_name, row_id in await db.execute(
+            select(SyncTombstone.table_name, SyncTombstone.row_id).where(
+                SyncTombstone.owner_id == profile.id, SyncTombstone.deleted_at > since
+            )
+        ):
+            deleted.setdefault(table_name, []).append(row_id)
+
+    passes = (await db.scalars(passes_q.order_by(ShorePass.id))).all()
+    if passes or deleted[ShorePass.__tablename__]:
+        out["shore_passes"] = {"upserts": passes, "deletes": deleted[ShorePass.__tablename__]}
+
+    bookings = (await db.scalars(bookings_q.order_by(CabBooking.id))).all()
+    if bookings or deleted[CabBooking.__tablename__]:
+        out["cab_bookings"] = {
+            "upserts": [_booking_out(b) for b in bookings],
+            "deletes": deleted[CabBooking.__tablename__],
+        }
+
+    snapshots = await db.run_sync(snapshot_all)
+    changed = {
+        name: snap.rows for name, snap in snapshots.items()
+        if since is None or client_versions.get(name) != snap.version
+    }
+    if changed:
+        out["catalogs"] = changed
+
+    out["cursor"] = encode_cursor(
+        now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS),
+        {name: snap.version for name, snap in snapshots.items()},
+    )
+    return out
@@ -0,0 +1,75 @@
+# app/api/v1/routes_dispatch.py
+"""
+Fleet-facing dispatch API (service-to-service, X-Internal-Token).
+
+The fleet feed pushes driver positions here. A driver stays available until
+assigned, removed, or silent for DISPATCH_DRIVER_TTL_SECONDS. Once assigned,
+the driver is busy and their positions are ignored until the feed releases
+them at the end of the trip.
+"""
+import time
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import require_internal_token
+from app.db.session import get_db
+from app.services.dispatch import Driver, dispatcher, driver_index
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+class DriverPositionIn(BaseModel):
+    driver_id: str
+    name: str
+    phone: str
+    vehicle_type: Literal["ac", "premium", "xl"]
+    seats: int = Field(ge=1, le=12)
+    lat: float = Field(ge=-90, le=90)
+    lng: float = Field(ge=-180, le=180)
+
+
+class DriverPositionsIn(BaseModel):
+    drivers: List[DriverPositionIn] = Field(min_length=1, max_length=5000)
+
+
+class DispatchRoundOut(BaseModel):
+    pending: int
+    assigned: int
+    unmatched: int
+    conflicts: int
+    match_ms: float
+    total_ms: float
+
+
+@router.put("/drivers")
+def push_driver_positions(body: DriverPositionsIn):
+    """Upsert available drivers and their positions (batch). Busy drivers are skipped."""
+    now = time.monotonic()
+    updated = driver_index.upsert_many(Driver(**d.model_dump(), seen_at=now) for d in body.drivers)
+    return {"updated": updated, "busy": len(body.drivers) - updated, "available": len(driver_index)}
+
+
+@router.delete("/drivers/{driver_id}")
+def remove_driver(driver_id: str):
+    """Driver went off shift or is busy outside the app."""
+    return {"removed": driver_index.remove(driver_id) is not None}
+
+
+@router.post("/drivers/{driver_id}/release")
+def release_driver(driver_id: str):
+    """Trip completed or cancelled: the driver's next position makes them available."""
+    return {"released": driver_index.release(driver_id)}
+
+
+@router.post("/run", response_model=DispatchRoundOut)
+def run_dispatch(db: Session = Depends(get_db)):
+    """Run one matching round now (the background loop does this every DISPATCH_INTERVAL_SECONDS)."""
+    return dispatcher.run_once(db)
+
+
+@router.get("/stats")
+def dispatch_stats():
+    return dispatcher.stats()
@@ -1,56 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models.hotels import Hotel
+from app.api.v1.conditional import etag_matches, not_modified, set_etag, weak_etag
+from app.api.v1.nearby import near_params
+from app.db.session import get_read_db
+from app.services.catalog_cache import NearQuery, hotels_cache
 from typing import List, Optional
 
 router = APIRouter()
 
+class HotelOut(BaseModel):
+    id: int
+    name: str
+    location: str
+    distance_from_port: float
+    rating: float
+    price_per_night: float
+    phone: Optional[str] = None
+    image_url: Optional[str] = None
+    lat: float
+    lng: float
+    created_at: datetime
+    updated_at: datetime
+    # only set on near= queries
+    distance_km: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
 # Get all hotels
-@router.get("/")
+@router.get("/", response_model=List[HotelOut])
 def get_hotels(
     max_dist: Optional[float] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    near: Optional[NearQuery] = Depends(near_params),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Hotel)
-    if max_dist is not None:
-        query = query.filter(Hotel.distance_from_port <= max_dist)
-    if min_price is not None:
-        query = query.filter(Hotel.price_per_night >= min_price)
-    if max_price is not None:
-        query = query.filter(Hotel.price_per_night <= max_price)
-    
-    hotels = query.all()
-    return hotels
+    return hotels_cache.filter(
+        db,
+        le={"distance_from_port": max_dist, "price_per_night": max_price},
+        ge={"price_per_night": min_price},
+        near=near,
+    )
 
 # Get hotels based on filters
-@router.get("/filters")
+@router.get("/filters", response_model=List[HotelOut])
 def get_hotels_by_filters(
     max_dist: Optional[float] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_rating: Optional[float] = None,
-    db: Session = Depends(get_db)
+    near: Optional[NearQuery] = Depends(near_params),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Hotel)
-    if max_dist is not None:
-        query = query.filter(Hotel.distance_from_port <= max_dist)
-    if min_price is not None:
-        query = query.filter(Hotel.price_per_night >= min_price)
-    if max_price is not None:
-        query = query.filter(Hotel.price_per_night <= max_price)
-    if min_rating is not None:
-        query = query.filter(Hotel.rating >= min_rating)
-    
-    hotels = query.all()
-    return hotels
+    return hotels_cache.filter(
+        db,
+        le={"distance_from_port": max_dist, "price_per_night": max_price},
+        ge={"price_per_night": min_price, "rating": min_rating},
+        near=near,
+    )
 
 # Get hotel by id
-@router.get("/{id}")
-def get_hotel(id: int, db: Session = Depends(get_db)):
-    hotel = db.query(Hotel).filter(Hotel.id == id).first()
+@router.get("/{id}", response_model=HotelOut)
+def get_hotel(id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    snap = hotels_cache.snapshot(db)
+    hotel = snap.by_id.get(id)
     if not hotel:
         raise HTTPException(status_code=404, detail="Hotel not found")
+
+    # any write to the table bumps the catalog version
+    etag = weak_etag("hotel", id, snap.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return hotel
@@ -0,0 +1,44 @@
+# app/api/v1/routes_internal.py
+from fastapi import APIRouter, Depends
+
+from app.api.v1.deps import require_internal_token
+from app.db import session
+from app.db.pool import pool_status
+from app.services.auth import token_cache_stats
+from app.services.catalog_cache import catalog_cache_stats
+from app.services.dispatch import dispatcher
+from app.services.fares import pricing_cache
+from app.services.password_hashing import password_hasher
+from app.services.principals import principal_cache, token_version_cache
+from app.services.routing import road_router
+from app.services.scheduler import booking_scheduler
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/metrics")
+def metrics():
+    """Per-worker runtime metrics: DB pools, auth caches, password hashing, catalog cache, routing, dispatch, scheduler."""
+    pools = {
+        "primary": pool_status(session.engine, session.engine_pool_metrics),
+        "primary_async": pool_status(session.async_engine.sync_engine, session.async_engine_pool_metrics),
+    }
+    if session.replica_engine is not None:
+        pools["replica"] = pool_status(session.replica_engine, session.replica_engine_pool_metrics)
+        pools["replica_async"] = pool_status(
+            session.async_replica_engine.sync_engine, session.async_replica_engine_pool_metrics
+        )
+    return {
+        "db_pools": pools,
+        "auth": {
+            "principal_cache": principal_cache.stats(),
+            "token_version_cache": token_version_cache.stats(),
+            "token_cache": token_cache_stats(),
+        },
+        "password_hashing": password_hasher.stats(),
+        "catalog_cache": catalog_cache_stats(),
+        "routing": road_router.stats(),
+        "cab_pricing": pricing_cache.stats(),
+        "dispatch": dispatcher.stats(),
+        "booking_scheduler": booking_scheduler.stats(),
+    }
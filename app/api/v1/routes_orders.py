@@ -1,18 +1,18 @@
 from typing import List, Optional, Literal, Union
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Header, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import false, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.db.models.user import User
+from app.api.v1.conditional import etag_matches, has_conditional, not_modified, set_etag, weak_etag
+from app.api.v1.deps import get_current_claims, get_current_user
+from app.api.v1.pagination import Page, PageParams, build_page, by_id, keyset_by_id
+from app.db.session import get_async_db, get_async_read_db
 from app.db.models.order import Order
 from app.db.models.vendor_profile import VendorProfile
-from app.services.auth import decode_subject
-
-from typing import List, Optional, Literal
-from datetime import datetime
+from app.services.principals import Principal
 from app.db.models.order_event import OrderEvent
 
 
@@ -20,22 +20,6 @@ from app.db.models.order_event import OrderEvent
 
 router = APIRouter()
 
-# ---- auth (same as other routers) ----
-def get_current_user(
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None),
-) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
-    token = authorization.split(" ", 1)[1].strip()
-    email = decode_subject(token)
-    if not email:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
-
 # ---- Schemas ----
 class QuoteItemOut(BaseModel):
     name: str
@@ -119,30 +103,34 @@ class OrderEventOut(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-def _to_out(row: Order) -> OrderOut:
-    items = [QuoteItemOut(**it) for it in (row.items or [])]
-    return OrderOut(
-        id=row.id,
-        order_number=row.order_number,
-        rfq_id=row.rfq_id,
-        quote_id=row.quote_id,
-        buyer_user_id=row.buyer_user_id,
-        vendor_user_id=row.vendor_user_id,
-        vendor_company=row.vendor_company,
-        port=row.port,
-        currency=row.currency,
-        items=items,
-        shipping_cost=float(row.shipping_cost),
-        discount_pct=float(row.discount_pct),
-        tax_pct=float(row.tax_pct),
-        subtotal=float(row.subtotal),
-        tax_amount=float(row.tax_amount),
-        grand_total=float(row.grand_total),
-        delivery_time_days=row.delivery_time_days,
-        notes=row.notes,
-        status=row.status,
-        created_at=row.created_at,
-    )
+def order_out(row: Order) -> dict:
+    """
+    Plain dict, validated once against OrderOut by FastAPI's response_model
+    (Numeric columns arrive as Decimal and are coerced there). Also used by
+    quote acceptance in routes_quotes.
+    """
+    return {
+        "id": row.id,
+        "order_number": row.order_number,
+        "rfq_id": row.rfq_id,
+        "quote_id": row.quote_id,
+        "buyer_user_id": row.buyer_user_id,
+        "vendor_user_id": row.vendor_user_id,
+        "vendor_company": row.vendor_company,
+        "port": row.port,
+        "currency": row.currency,
+        "items": row.items or [],
+        "shipping_cost": row.shipping_cost,
+        "discount_pct": row.discount_pct,
+        "tax_pct": row.tax_pct,
+        "subtotal": row.subtotal,
+        "tax_amount": row.tax_amount,
+        "grand_total": row.grand_total,
+        "delivery_time_days": row.delivery_time_days,
+        "notes": row.notes,
+        "status": row.status,
+        "created_at": row.created_at,
+    }
 
 # ---- List my orders ----
 # role-based visibility:
@@ -151,61 +139,87 @@ def _to_out(row: Order) -> OrderOut:
 # - agent:             show all (or restrict per your business rules)
 StatusLiteral = Literal["confirmed", "processing", "fulfilled", "cancelled"]
 
-@router.get("/orders", response_model=List[OrderOut])
-def list_orders(
+@router.get("/orders", response_model=Page[OrderOut])
+async def list_orders(
     status: Optional[StatusLiteral] = Query(default=None),
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    me: Principal = Depends(get_current_claims),
 ):
-    q = db.query(Order)
+    q = select(Order)
     if me.role == "shipping_company":
-        q = q.filter(Order.buyer_user_id == me.id)
+        q = q.where(Order.buyer_user_id == me.id)
     elif me.role == "vendor":
-        q = q.filter(Order.vendor_user_id == me.id)
+        q = q.where(Order.vendor_user_id == me.id)
     elif me.role == "agent":
         # Agents see all; change if needed
         pass
     else:
         # no role -> nothing
-        q = q.filter(False)
+        q = q.where(false())
 
     if status:
-        q = q.filter(Order.status == status)
+        q = q.where(Order.status == status)
 
-    rows = q.order_by(Order.id.desc()).all()
-    return [_to_out(r) for r in rows]
+    rows = (await db.scalars(keyset_by_id(q, Order.id, params))).all()
+    return build_page(rows, params, by_id, order_out)
 
 # ---- Get one order ----
-@router.get("/orders/{order_id}", response_model=OrderOut)
-def get_order(
-    order_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
-):
-    o = db.get(Order, order_id)
-    if not o:
-        raise HTTPException(404, "Order not found")
-
+def _ensure_order_visible(o, me: Principal) -> None:
+    """Reads only buyer_user_id / vendor_user_id, so a partial row works too."""
     if me.role == "shipping_company" and o.buyer_user_id != me.id:
         raise HTTPException(403, "Not allowed")
     if me.role == "vendor" and o.vendor_user_id != me.id:
         raise HTTPException(403, "Not allowed")
     # agent allowed (or restrict if needed)
 
-    return _to_out(o)
+def _order_etag(order_id: int, version) -> str:
+    return weak_etag("order", order_id, version)
+
+@router.get("/orders/{order_id}", response_model=OrderOut)
+async def get_order(
+    order_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
+):
+    # conditional request: check the version columns before loading the row
+    if has_conditional(request):
+        head = (await db.execute(
+            select(
+                Order.id,
+                Order.buyer_user_id,
+                Order.vendor_user_id,
+                func.coalesce(Order.updated_at, Order.created_at).label("version"),
+            ).where(Order.id == order_id)
+        )).first()
+        if head:
+            _ensure_order_visible(head, me)
+            etag = _order_etag(head.id, head.version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+    o = await db.get(Order, order_id)
+    if not o:
+        raise HTTPException(404, "Order not found")
+    _ensure_order_visible(o, me)
+
+    set_etag(response, _order_etag(o.id, o.updated_at or o.created_at))
+    return order_out(o)
 
 # ---- Update order status ----
 class OrderStatusIn(BaseModel):
     status: StatusLiteral = Field(description="confirmed|processing|fulfilled|cancelled")
 
 @router.patch("/orders/{order_id}/status", response_model=OrderOut)
-def update_order_status(
+async def update_order_status(
     order_id: int,
     body: OrderStatusIn,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
-    o = db.get(Order, order_id)
+    o = await db.get(Order, order_id)
     if not o:
         raise HTTPException(404, "Order not found")
 
@@ -219,20 +233,20 @@ def update_order_status(
         raise HTTPException(403, "Not allowed")
 
     o.status = body.status
-    db.commit()
-    db.refresh(o)
-    return _to_out(o)
+    await db.commit()
+    await db.refresh(o)
+    return order_out(o)
 
 
 # --- Post a new tracking event (vendor or agent; shipping can post too if you want) ---
 @router.post("/orders/{order_id}/events", response_model=OrderEventOut, status_code=status.HTTP_201_CREATED)
-def create_order_event(
+async def create_order_event(
     order_id: int,
     body: OrderEventIn,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
-    o = db.get(Order, order_id)
+    o = await db.get(Order, order_id)
     if not o:
         raise HTTPException(404, "Order not found")
 
@@ -264,20 +278,20 @@ def create_order_event(
     if new_order_status and new_order_status != o.status:
         o.status = new_order_status
 
-    db.commit()
-    db.refresh(ev)
-    db.refresh(o)
+    await db.commit()
+    await db.refresh(ev)
+    await db.refresh(o)
 
     return OrderEventOut.model_validate(ev)
 
 # --- List tracking events for an order ---
 @router.get("/orders/{order_id}/events", response_model=List[OrderEventOut])
-def list_order_events(
+async def list_order_events(
     order_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
-    o = db.get(Order, order_id)
+    o = await db.get(Order, order_id)
     if not o:
         raise HTTPException(404, "Order not found")
 
@@ -290,10 +304,9 @@ def list_order_events(
     if not allowed:
         raise HTTPException(403, "Not allowed")
 
-    rows = (
-        db.query(OrderEvent)
-        .filter(OrderEvent.order_id == order_id)
+    rows = (await db.scalars(
+        select(OrderEvent)
+        .where(OrderEvent.order_id == order_id)
         .order_by(OrderEvent.created_at.asc(), OrderEvent.id.asc())
-        .all()
-    )
+    )).all()
     return [OrderEventOut.model_validate(r) for r in rows]
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.db.models.pub import Pub
-from app.api.v1.routes_auth import get_current_user
-from app.db.models.user import User
+from app.api.v1.deps import get_current_user
+from app.api.v1.conditional import etag_matches, not_modified, set_etag, weak_etag
+from app.api.v1.nearby import near_params
+from app.services.catalog_cache import NearQuery, pubs_cache
+from app.services.principals import Principal
 
 router = APIRouter()
 
@@ -28,34 +31,45 @@ class PubBase(BaseModel):
 
 class PubOut(PubBase):
     id: int
+    # only set on near= queries
+    distance_km: Optional[float] = None
 
     class Config:
         from_attributes = True
 
 @router.get("/", response_model=List[PubOut])
 def get_pubs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    near: Optional[NearQuery] = Depends(near_params),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    pubs = db.query(Pub).all()
-    return pubs
+    return pubs_cache.filter(db, near=near)
 
 @router.get("/{pub_id}", response_model=PubOut)
 def get_pub_details(
     pub_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    pub = db.query(Pub).filter(Pub.id == pub_id).first()
+    snap = pubs_cache.snapshot(db)
+    pub = snap.by_id.get(pub_id)
     if not pub:
         raise HTTPException(status_code=404, detail="Pub not found")
+
+    # any write to the table bumps the catalog version
+    etag = weak_etag("pub", pub_id, snap.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return pub
 
 # Admin endpoint to seed data (for development)
 @router.post("/seed", status_code=status.HTTP_201_CREATED)
 def seed_pubs(
     db: Session = Depends(get_db),
-    # current_user: User = Depends(get_current_user) # In production we'd protect this
+    # current_user: Principal = Depends(get_current_user) # In production we'd protect this
 ):
     # Check if data already exists
     if db.query(Pub).first():
@@ -3,16 +3,19 @@ from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Header, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field, ConfigDict
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.db.models.user import User
+from app.api.v1.deps import get_current_user
+from app.api.v1.pagination import Page, PageParams, build_page, by_id, keyset_by_id
+from app.api.v1.routes_orders import order_out
+from app.db.session import get_async_db
 from app.db.models.rfq import RFQ
 from app.db.models.vendor_profile import VendorProfile
 from app.db.models.rfq_quote import RFQQuote
-from app.services.auth import decode_subject
+from app.services.principals import Principal
 from app.db.models.order import Order
 from sqlalchemy.exc import IntegrityError
 
@@ -20,22 +23,6 @@ router = APIRouter()
 
 
 
-# -------- auth dependency (same behavior as in your other routes) --------
-def get_current_user(
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None),
-) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
-    token = authorization.split(" ", 1)[1].strip()
-    email = decode_subject(token)
-    if not email:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
-
 # -------------------- Schemas --------------------
 class QuoteItemIn(BaseModel):
     unit_price: float = Field(ge=0)
@@ -107,22 +94,45 @@ def _money(x: Union[float, Decimal]) -> Decimal:
     d = Decimal(str(x))
     return d.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
+# Responses are returned as plain dicts: FastAPI validates them against the
+# response_model exactly once (Decimal -> float happens there) instead of
+# us building the model and FastAPI dumping and re-validating it.
+def _quote_out(q: RFQQuote, vendor_company: Optional[str]) -> dict:
+    return {
+        "id": q.id,
+        "rfq_id": q.rfq_id,
+        "vendor_user_id": q.vendor_user_id,
+        "vendor_company": vendor_company,
+        "currency": q.currency,
+        "items": q.items or [],
+        "shipping_cost": q.shipping_cost,
+        "discount_pct": q.discount_pct,
+        "tax_pct": q.tax_pct,
+        "subtotal": q.subtotal,
+        "tax_amount": q.tax_amount,
+        "grand_total": q.grand_total,
+        "delivery_time_days": q.delivery_time_days,
+        "vendor_notes": q.vendor_notes,
+        "status": q.status,
+        "created_at": q.created_at,
+    }
+
 # -------------------- Vendor: submit/replace a quote --------------------
 @router.post("/vendor/quotes", response_model=QuoteOut, status_code=status.HTTP_201_CREATED)
-def submit_quote(
+async def submit_quote(
     body: QuoteSubmitIn,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
     if me.role != "vendor":
         raise HTTPException(status_code=403, detail="Only vendors can submit quotations")
 
-    rfq = db.get(RFQ, body.rfq_id)
+    rfq = await db.get(RFQ, body.rfq_id)
     if not rfq:
         raise HTTPException(status_code=404, detail="RFQ not found")
 
     # Vendor profile must exist; optionally ensure port is served
-    profile = db.query(VendorProfile).filter(VendorProfile.user_id == me.id).first()
+    profile = await db.scalar(select(VendorProfile).where(VendorProfile.user_id == me.id))
     if not profile:
         raise HTTPException(status_code=403, detail="Complete vendor profile before quoting")
 
@@ -173,10 +183,9 @@ def submit_quote(
     grand_total = taxable_base + tax_amount
 
     # Upsert (one active quote per vendor per RFQ)
-    existing = (
-        db.query(RFQQuote)
-        .filter(RFQQuote.rfq_id == rfq.id, RFQQuote.vendor_user_id == me.id)
-        .first()
+    existing = await db.scalar(
+        select(RFQQuote)
+        .where(RFQQuote.rfq_id == rfq.id, RFQQuote.vendor_user_id == me.id)
     )
     if existing:
         existing.currency = body.currency
@@ -190,8 +199,8 @@ def submit_quote(
         existing.delivery_time_days = body.delivery_time_days
         existing.vendor_notes = body.vendor_notes
         existing.status = "submitted"
-        db.commit()
-        db.refresh(existing)
+        await db.commit()
+        await db.refresh(existing)
         quote = existing
     else:
         quote = RFQQuote(
@@ -210,40 +219,23 @@ def submit_quote(
             status="submitted",
         )
         db.add(quote)
-        db.commit()
-        db.refresh(quote)
+        await db.commit()
+        await db.refresh(quote)
 
     # decorate response with vendor company
     vendor_company = profile.company_name if profile else None
 
-    return QuoteOut(
-        id=quote.id,
-        rfq_id=quote.rfq_id,
-        vendor_user_id=quote.vendor_user_id,
-        vendor_company=vendor_company,
-        currency=quote.currency,
-        items=[QuoteItemOut(**it) for it in quote.items],
-        shipping_cost=float(quote.shipping_cost),
-        discount_pct=float(quote.discount_pct),
-        tax_pct=float(quote.tax_pct),
-        subtotal=float(quote.subtotal),
-        tax_amount=float(quote.tax_amount),
-        grand_total=float(quote.grand_total),
-        delivery_time_days=quote.delivery_time_days,
-        vendor_notes=quote.vendor_notes,
-        status=quote.status,
-        created_at=quote.created_at,
-    )
+    return _quote_out(quote, vendor_company)
 
 
 # -------------------- Shipping company: list quotes for an RFQ --------------------
 @router.get("/rfqs/{rfq_id}/quotes", response_model=List[QuoteOut])
-def list_quotes_for_rfq(
+async def list_quotes_for_rfq(
     rfq_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
-    rfq = db.get(RFQ, rfq_id)
+    rfq = await db.get(RFQ, rfq_id)
     if not rfq:
         raise HTTPException(status_code=404, detail="RFQ not found")
 
@@ -252,96 +244,57 @@ def list_quotes_for_rfq(
         # (allow agent if you want them to see on behalf; remove role check if not desired)
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    quotes = (
-        db.query(RFQQuote)
-        .filter(RFQQuote.rfq_id == rfq_id)
+    quotes = (await db.scalars(
+        select(RFQQuote)
+        .where(RFQQuote.rfq_id == rfq_id)
         .order_by(RFQQuote.id.desc())
-        .all()
-    )
+    )).all()
 
     # attach vendor company
     vendor_profiles = {
-        vp.user_id: vp.company_name
-        for vp in db.query(VendorProfile).filter(
-            VendorProfile.user_id.in_([q.vendor_user_id for q in quotes] or [0])
+        user_id: company_name
+        for user_id, company_name in await db.execute(
+            select(VendorProfile.user_id, VendorProfile.company_name).where(
+                VendorProfile.user_id.in_([q.vendor_user_id for q in quotes] or [0])
+            )
         )
     }
 
-    out: List[QuoteOut] = []
-    for q in quotes:
-        out.append(
-            QuoteOut(
-                id=q.id,
-                rfq_id=q.rfq_id,
-                vendor_user_id=q.vendor_user_id,
-                vendor_company=vendor_profiles.get(q.vendor_user_id),
-                currency=q.currency,
-                items=[QuoteItemOut(**it) for it in q.items],
-                shipping_cost=float(q.shipping_cost),
-                discount_pct=float(q.discount_pct),
-                tax_pct=float(q.tax_pct),
-                subtotal=float(q.subtotal),
-                tax_amount=float(q.tax_amount),
-                grand_total=float(q.grand_total),
-                delivery_time_days=q.delivery_time_days,
-                vendor_notes=q.vendor_notes,
-                status=q.status,
-                created_at=q.created_at,
-            )
-        )
-    return out
+    return [_quote_out(q, vendor_profiles.get(q.vendor_user_id)) for q in quotes]
 
 # -------------------- (Optional) Vendor: list my quotes --------------------
-@router.get("/vendor/quotes", response_model=List[QuoteOut])
-def list_my_quotes(
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+@router.get("/vendor/quotes", response_model=Page[QuoteOut])
+async def list_my_quotes(
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
     rfq_id: Optional[int] = Query(default=None),
+    params: PageParams = Depends(),
 ):
     if me.role != "vendor":
         raise HTTPException(status_code=403, detail="Only vendors can view their quotes")
 
-    q = db.query(RFQQuote).filter(RFQQuote.vendor_user_id == me.id)
+    q = select(RFQQuote).where(RFQQuote.vendor_user_id == me.id)
     if rfq_id:
-        q = q.filter(RFQQuote.rfq_id == rfq_id)
-    rows = q.order_by(RFQQuote.id.desc()).all()
-
-    profile = db.query(VendorProfile).filter(VendorProfile.user_id == me.id).first()
-    company = profile.company_name if profile else None
-
-    out: List[QuoteOut] = []
-    for r in rows:
-        out.append(
-            QuoteOut(
-                id=r.id,
-                rfq_id=r.rfq_id,
-                vendor_user_id=r.vendor_user_id,
-                vendor_company=company,
-                currency=r.currency,
-                items=[QuoteItemOut(**it) for it in r.items],
-                shipping_cost=float(r.shipping_cost),
-                discount_pct=float(r.discount_pct),
-                tax_pct=float(r.tax_pct),
-                subtotal=float(r.subtotal),
-                tax_amount=float(r.tax_amount),
-                grand_total=float(r.grand_total),
-                delivery_time_days=r.delivery_time_days,
-                vendor_notes=r.vendor_notes,
-                status=r.status,
-                created_at=r.created_at,
-            )
-        )
-    return out
+        q = q.where(RFQQuote.rfq_id == rfq_id)
+    rows = (await db.scalars(keyset_by_id(q, RFQQuote.id, params))).all()
+    page = build_page(rows, params, by_id)
+
+    company = await db.scalar(
+        select(VendorProfile.company_name).where(VendorProfile.user_id == me.id)
+    )
+
+    page["items"] = [_quote_out(r, company) for r in page["items"]]
+    return page
 
 
 @router.post("/rfqs/{rfq_id}/quotes/{quote_id}/accept", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
-def accept_quote(
+async def accept_quote(
     rfq_id: int,
     quote_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
-    rfq = db.get(RFQ, rfq_id)
+    rfq = await db.get(RFQ, rfq_id)
     if not rfq:
         raise HTTPException(404, "RFQ not found")
 
@@ -349,34 +302,39 @@ def accept_quote(
     if me.id != rfq.user_id and me.role != "agent":
         raise HTTPException(403, "Not allowed")
 
-    quote = db.query(RFQQuote).filter(
+    quote = await db.scalar(select(RFQQuote).where(
         RFQQuote.id == quote_id, RFQQuote.rfq_id == rfq_id
-    ).first()
+    ))
     if not quote:
         raise HTTPException(404, "Quote not found")
 
     # Enforce one accepted per RFQ: either an accepted quote or existing order
-    accepted = db.query(RFQQuote).filter(
+    accepted = await db.scalar(select(RFQQuote).where(
         RFQQuote.rfq_id == rfq_id, RFQQuote.status == "accepted"
-    ).first()
+    ))
     if accepted and accepted.id != quote_id:
         raise HTTPException(409, "Another quote for this RFQ is already accepted")
 
-    existing_order = db.query(Order).filter(Order.rfq_id == rfq_id).first()
+    existing_order = await db.scalar(select(Order.id).where(Order.rfq_id == rfq_id))
     if existing_order:
         raise HTTPException(409, "Order already created for this RFQ")
 
     # accept this quote, reject others
     quote.status = "accepted"
-    db.query(RFQQuote).filter(
-        RFQQuote.rfq_id == rfq_id,
-        RFQQuote.id != quote_id,
-        RFQQuote.status == "submitted"
-    ).update({RFQQuote.status: "rejected"})
+    await db.execute(
+        update(RFQQuote)
+        .where(
+            RFQQuote.rfq_id == rfq_id,
+            RFQQuote.id != quote_id,
+            RFQQuote.status == "submitted"
+        )
+        .values(status="rejected")
+    )
 
     # vendor company
-    vp = db.query(VendorProfile).filter(VendorProfile.user_id == quote.vendor_user_id).first()
-    vendor_company = vp.company_name if vp else None
+    vendor_company = await db.scalar(
+        select(VendorProfile.company_name).where(VendorProfile.user_id == quote.vendor_user_id)
+    )
 
     # Create order from quote
     order = Order(
@@ -401,33 +359,12 @@ def accept_quote(
     )
     db.add(order)
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(409, "Order already exists for this RFQ")
 
-    db.refresh(order)
-    db.refresh(quote)
-
-    return OrderOut(
-        id=order.id,
-        order_number=order.order_number,
-        rfq_id=order.rfq_id,
-        quote_id=order.quote_id,
-        buyer_user_id=order.buyer_user_id,
-        vendor_user_id=order.vendor_user_id,
-        vendor_company=order.vendor_company,
-        port=order.port,
-        currency=order.currency,
-        items=[QuoteItemOut(**it) for it in order.items or []],
-        shipping_cost=float(order.shipping_cost),
-        discount_pct=float(order.discount_pct),
-        tax_pct=float(order.tax_pct),
-        subtotal=float(order.subtotal),
-        tax_amount=float(order.tax_amount),
-        grand_total=float(order.grand_total),
-        delivery_time_days=order.delivery_time_days,
-        notes=order.notes,
-        status=order.status,
-        created_at=order.created_at,
-    )
+    await db.refresh(order)
+    await db.refresh(quote)
+
+    return order_out(order)
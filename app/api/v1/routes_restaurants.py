@@ -1,28 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.db.session import get_db
-from app.db.models.restaurant import Restaurant
+from datetime import datetime
+from app.api.v1.conditional import etag_matches, not_modified, set_etag, weak_etag
+from app.api.v1.nearby import near_params
+from app.db.session import get_read_db
+from app.services.catalog_cache import NearQuery, restaurants_cache
 
 router = APIRouter()
 
-@router.get("/")
+class RestaurantOut(BaseModel):
+    id: int
+    name: str
+    location_name: str
+    distance_from_port: float
+    rating: float
+    price_per_person: float
+    timings: str
+    service_type: str
+    popular_for: Optional[List[str]] = None
+    phone: Optional[str] = None
+    lat: float
+    lng: float
+    image_url: Optional[str] = None
+    menu_images: Optional[List[str]] = None
+    description: Optional[str] = None
+    address: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    # only set on near= queries
+    distance_km: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+@router.get("/", response_model=List[RestaurantOut])
 def get_restaurants(
     max_dist: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    near: Optional[NearQuery] = Depends(near_params),
+    db: Session = Depends(get_read_db)
 ):
-    query = db.query(Restaurant)
-    if max_dist is not None:
-        query = query.filter(Restaurant.distance_from_port <= max_dist)
-    if max_price is not None:
-        query = query.filter(Restaurant.price_per_person <= max_price)
-    
-    return query.all()
+    return restaurants_cache.filter(
+        db, le={"distance_from_port": max_dist, "price_per_person": max_price}, near=near
+    )
 
-@router.get("/{id}")
-def get_restaurant(id: int, db: Session = Depends(get_db)):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == id).first()
+@router.get("/{id}", response_model=RestaurantOut)
+def get_restaurant(id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    snap = restaurants_cache.snapshot(db)
+    restaurant = snap.by_id.get(id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    # any write to the table bumps the catalog version
+    etag = weak_etag("restaurant", id, snap.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return restaurant
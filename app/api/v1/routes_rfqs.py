@@ -2,46 +2,22 @@
 from datetime import datetime
 from typing import List, Optional, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field, ConfigDict
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.api.v1.conditional import etag_matches, has_conditional, not_modified, set_etag, weak_etag
+from app.api.v1.deps import get_current_claims, get_current_user
+from app.api.v1.pagination import Page, PageParams, build_page, by_id, empty_page, keyset_by_id
+from app.db.session import get_async_db, get_async_read_db
 from app.db.models.rfq import RFQ
-from app.db.models.user import User
 from app.db.models.vendor_profile import VendorProfile
-from app.services.auth import decode_subject
+from app.services.principals import Principal
 
 router = APIRouter()
 
 
-# -------- Auth dependency (reads Bearer token) --------
-def get_current_user(
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None),
-) -> User:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing bearer token",
-        )
-    token = authorization.split(" ", 1)[1].strip()
-    email = decode_subject(token)
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-        )
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    return user
-
-
 # ------------- Schemas -------------
 class Item(BaseModel):
     name: str
@@ -100,20 +76,20 @@ class RFQOut(RFQIn):
 
 
 # ------------- Helpers -------------
-def _get_vendor_ports(db: Session, user_id: int) -> List[str]:
-    vp = (
-        db.query(VendorProfile)
-        .filter(VendorProfile.user_id == user_id)
-        .first()
+async def _get_vendor_ports(db: AsyncSession, user_id: int) -> List[str]:
+    ports = await db.scalar(
+        select(VendorProfile.ports_served)
+        .where(VendorProfile.user_id == user_id)
     )
     # ports_served is a Postgres text[] (can be None)
-    return list(vp.ports_served or []) if vp else []
+    return list(ports or [])
 
 
-def _ensure_rfq_visible_to_user(db: Session, rfq: RFQ, me: User) -> None:
+async def _ensure_rfq_visible_to_user(db: AsyncSession, rfq: RFQ, me: Principal) -> None:
     """
     Raises 404 if the RFQ should not be visible to the current user.
     We use 404 (not 403) to avoid leaking existence of RFQs.
+    Only `user_id` and `port` are read, so a partial row works too.
     """
     if me.role == "shipping_company":
         if rfq.user_id != me.id:
@@ -121,7 +97,7 @@ def _ensure_rfq_visible_to_user(db: Session, rfq: RFQ, me: User) -> None:
                 status_code=status.HTTP_404_NOT_FOUND, detail="RFQ not found"
             )
     elif me.role == "vendor":
-        ports = _get_vendor_ports(db, me.id)
+        ports = await _get_vendor_ports(db, me.id)
         if not ports or rfq.port not in ports:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="RFQ not found"
@@ -134,10 +110,11 @@ def _ensure_rfq_visible_to_user(db: Session, rfq: RFQ, me: User) -> None:
 
 
 # ------------- Routes -------------
-@router.get("/rfqs", response_model=List[RFQOut])
-def list_rfqs(
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+@router.get("/rfqs", response_model=Page[RFQOut])
+async def list_rfqs(
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    me: Principal = Depends(get_current_claims),
 ):
     """
     - shipping_company: list only my RFQs
@@ -145,33 +122,29 @@ def list_rfqs(
     - agent/others: return empty for now
     """
     if me.role == "shipping_company":
-        return (
-            db.query(RFQ)
-            .filter(RFQ.user_id == me.id)
-            .order_by(RFQ.id.desc())
-            .all()
+        rows = await db.scalars(
+            keyset_by_id(select(RFQ).where(RFQ.user_id == me.id), RFQ.id, params)
         )
+        return build_page(rows.all(), params, by_id)
 
     if me.role == "vendor":
-        ports = _get_vendor_ports(db, me.id)
+        ports = await _get_vendor_ports(db, me.id)
         if not ports:
-            return []
-        return (
-            db.query(RFQ)
-            .filter(RFQ.port.in_(ports))
-            .order_by(RFQ.id.desc())
-            .all()
+            return empty_page()
+        rows = await db.scalars(
+            keyset_by_id(select(RFQ).where(RFQ.port.in_(ports)), RFQ.id, params)
         )
+        return build_page(rows.all(), params, by_id)
 
     # Agents (and any other roles) – no RFQs yet
-    return []
+    return empty_page()
 
 
 @router.post("/rfqs", response_model=RFQOut, status_code=status.HTTP_201_CREATED)
-def create_rfq(
+async def create_rfq(
     body: RFQIn,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
     """Create a new RFQ; only shipping companies can create."""
     if me.role != "shipping_company":
@@ -186,64 +159,73 @@ def create_rfq(
 
     rfq = RFQ(user_id=me.id, **payload)
     db.add(rfq)
-    db.commit()
-    db.refresh(rfq)
+    await db.commit()
+    await db.refresh(rfq)
     return rfq
 
-@router.get("/rfqs/market", response_model=List[RFQOut])
-def vendor_market(
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+@router.get("/rfqs/market", response_model=Page[RFQOut])
+async def vendor_market(
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    me: Principal = Depends(get_current_claims),
 ):
     # only vendors see the market feed
     if me.role != "vendor":
         raise HTTPException(status_code=403, detail="Only vendors can access RFQ market")
 
-    profile = (
-        db.query(VendorProfile)
-        .filter(VendorProfile.user_id == me.id)
-        .first()
-    )
+    ports = await _get_vendor_ports(db, me.id)
     # no profile or no ports -> empty list
-    if not profile or not profile.ports_served:
-        return []
-
-    return (
-        db.query(RFQ)
-        .filter(RFQ.port.in_(profile.ports_served))
-        .order_by(RFQ.id.desc())
-        .all()
+    if not ports:
+        return empty_page()
+
+    rows = await db.scalars(
+        keyset_by_id(select(RFQ).where(RFQ.port.in_(ports)), RFQ.id, params)
     )
+    return build_page(rows.all(), params, by_id)
 
 
 @router.get("/rfqs/{rfq_id}", response_model=RFQOut)
-def get_rfq(
+async def get_rfq(
     rfq_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
     """Fetch a single RFQ if visible to the current user."""
-    rfq = db.get(RFQ, rfq_id)
+    # RFQs are immutable once created, so id + created_at is their version
+    if has_conditional(request):
+        head = (await db.execute(
+            select(RFQ.id, RFQ.user_id, RFQ.port, RFQ.created_at).where(RFQ.id == rfq_id)
+        )).first()
+        if head:
+            await _ensure_rfq_visible_to_user(db, head, me)
+            etag = weak_etag("rfq", head.id, head.created_at)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+    rfq = await db.get(RFQ, rfq_id)
     if not rfq:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="RFQ not found"
         )
-    _ensure_rfq_visible_to_user(db, rfq, me)
+    await _ensure_rfq_visible_to_user(db, rfq, me)
+    set_etag(response, weak_etag("rfq", rfq.id, rfq.created_at))
     return rfq
 
 
 @router.get("/rfqs/{rfq_id}/pdf")
-def rfq_pdf(
+async def rfq_pdf(
     rfq_id: int,
-    db: Session = Depends(get_db),
-    me: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    me: Principal = Depends(get_current_user),
 ):
     """Stub for RFQ PDF; visibility rules apply."""
-    rfq = db.get(RFQ, rfq_id)
+    rfq = await db.get(RFQ, rfq_id)
     if not rfq:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="RFQ not found"
         )
-    _ensure_rfq_visible_to_user(db, rfq, me)
+    await _ensure_rfq_visible_to_user(db, rfq, me)
     # TODO: stream/generate real PDF
     return {"ok": True, "rfq_id": rfq_id}
@@ -0,0 +1,51 @@
+# app/api/v1/routes_search.py
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api.v1.deps import get_current_claims
+from app.api.v1.pagination import Page, PageParams, slice_page
+from app.db.session import get_read_db
+from app.services.principals import Principal
+from app.services.search import Hit, search_catalogs
+
+router = APIRouter()
+
+CatalogType = Literal["pub", "restaurant", "hotel"]
+
+
+class SearchHitOut(BaseModel):
+    type: CatalogType
+    id: int
+    name: str
+    score: float
+    item: Dict[str, Any]
+
+
+def _hit_out(hit: Hit) -> dict:
+    return {
+        "type": hit.kind,
+        "id": hit.row["id"],
+        "name": hit.row["name"],
+        "score": round(hit.score, 4),
+        "item": hit.row,
+    }
+
+
+@router.get("/", response_model=Page[SearchHitOut])
+def search(
+    q: str = Query(min_length=1, max_length=200),
+    type: Optional[List[CatalogType]] = Query(default=None),
+    params: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_claims),
+):
+    """
+    Ranked search over pubs, restaurants and hotels (names, cuisines, tags,
+    descriptions). Prefix and one-typo matches are included.
+    `type` may be repeated to restrict the catalogs searched.
+    """
+    hits = search_catalogs(db, q, type)
+    return slice_page(hits, params, _hit_out)
@@ -2,21 +2,14 @@
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.db.models.user import User
-from app.services.auth import verify_token  # your helper that decodes JWT
+from app.api.v1.deps import get_current_user
+from app.services.principals import Principal
 
 router = APIRouter()
 
-# Used only to read the token from "Authorization: Bearer <token>".
-# It also makes the Swagger docs show a lock icon.
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
-
 class UserOut(BaseModel):
     id: int
     name: Optional[str] = None
@@ -28,25 +21,8 @@ class UserOut(BaseModel):
     class Config:
         from_attributes = True  # SQLAlchemy -> Pydantic (pydantic v2)
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-) -> User:
-    """
-    Resolve the current user from the Bearer token.
-    """
-    email = verify_token(token)
-    if not email:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    return user
-
 @router.get("/me", response_model=UserOut)
-def read_me(current_user: User = Depends(get_current_user)):
+def read_me(current_user: Principal = Depends(get_current_user)):
     """
     Return the authenticated user's profile.
     """
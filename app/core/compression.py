@@ -0,0 +1,233 @@
+# app/core/compression.py
+"""
+Response compression and binary encoding negotiation (pure ASGI middleware).
+
+- Accept-Encoding: br (when the `brotli` package is installed) or gzip, for
+  textual responses of at least COMPRESSION_MIN_BYTES. Longer streaming
+  responses are compressed chunk by chunk.
+- Accept: application/msgpack (or application/x-msgpack) preferred over JSON
+  turns a JSON body into MessagePack.
+- Routes serving already-compressed payloads opt out with @no_compression.
+
+The endpoint is read from the ASGI scope after routing, so the opt-out
+works without a path list here.
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Optional
+
+import msgpack
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # optional: gzip is always available
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def no_compression(endpoint):
+    """Mark a route endpoint whose responses must go out uncompressed."""
+    endpoint._no_compression = True
+    return endpoint
+
+
+def _qvalues(header: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        for p in params.split(";"):
+            name, _, value = p.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        out[token.strip().lower()] = q
+    return out
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    prefs = _qvalues(accept_encoding)
+    return prefs.get(encoding, prefs.get("*", 0.0)) > 0
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    prefs = _qvalues(accept_encoding)
+    wildcard = prefs.get("*", 0.0)
+    candidates = [("br", 2), ("gzip", 1)] if brotli is not None else [("gzip", 1)]
+    best = max(candidates, key=lambda c: (prefs.get(c[0], wildcard), c[1]))
+    return best[0] if prefs.get(best[0], wildcard) > 0 else None
+
+
+def wants_msgpack(accept: str) -> bool:
+    prefs = _qvalues(accept)
+    packed = max(prefs.get(t, 0.0) for t in MSGPACK_TYPES)
+    json_q = max(prefs.get("application/json", 0.0), prefs.get("*/*", 0.0), prefs.get("application/*", 0.0))
+    return packed > 0 and packed >= json_q
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=brotli_quality)
+            self._finish = self._c.finish
+            self.process = self._c.process
+        else:
+            self._c = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+            self._finish = self._c.flush
+            self.process = self._c.compress
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = choose_encoding(headers.get("accept-encoding", ""))
+        msgpack_ok = wants_msgpack(headers.get("accept", ""))
+        if encoding is None and not msgpack_ok:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _Responder(self, scope, send, encoding, msgpack_ok)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """
+    Decides per response once enough body has arrived. Responses often come
+    in several chunks even when the endpoint returned one body (e.g. through
+    @app.middleware("http") layers), so the first chunks are buffered: up to
+    minimum_size before compressing, and whole for JSON that may become
+    MessagePack. Anything else is forwarded as it arrives.
+    """
+
+    def __init__(self, mw: CompressionMiddleware, scope: Scope, send: Send, encoding, msgpack_ok: bool):
+        self.mw = mw
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.msgpack_ok = msgpack_ok
+        self.start: Optional[Message] = None
+        self.headers: Optional[MutableHeaders] = None
+        self.buffer = bytearray()
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _compression_allowed(self, headers: MutableHeaders) -> bool:
+        endpoint = self.scope.get("endpoint")
+        return (
+            self.encoding is not None
+            and "content-encoding" not in headers
+            and _is_compressible(headers.get("content-type", ""))
+            and not getattr(endpoint, "_no_compression", False)
+        )
+
+    def _is_json(self, headers: MutableHeaders) -> bool:
+        return headers.get("content-type", "").startswith("application/json") and "content-encoding" not in headers
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.headers = MutableHeaders(raw=message["headers"])
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        if self.compressor is not None:  # streaming, already started
+            body = self.compressor.process(message.get("body", b""))
+            if not message.get("more_body", False):
+                body += self.compressor.finish()
+            if body or not message.get("more_body", False):
+                await self._send({**message, "body": body})
+            return
+
+        headers = self.headers
+        self.buffer += message.get("body", b"")
+        if not message.get("more_body", False):
+            await self._send_complete(bytes(self.buffer))
+            return
+
+        # more to come
+        if self.msgpack_ok and self._is_json(headers):
+            return  # needs the whole document
+        if not self._compression_allowed(headers):
+            self.passthrough = True
+            await self._flush_buffer()
+            return
+        if len(self.buffer) < self.mw.minimum_size:
+            return  # may still end up too small to be worth compressing
+
+        self.compressor = _Compressor(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+        if self._is_json(headers):
+            headers.add_vary_header("Accept")
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        body = self.compressor.process(bytes(self.buffer))
+        self.buffer.clear()
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def _flush_buffer(self) -> None:
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": bytes(self.buffer), "more_body": True})
+        self.buffer.clear()
+
+    async def _send_complete(self, body: bytes) -> None:
+        headers = self.headers
+        if self._is_json(headers):
+            headers.add_vary_header("Accept")
+            if self.msgpack_ok and body:
+                body = msgpack.packb(orjson.loads(body))
+                headers["Content-Type"] = "application/msgpack"
+
+        if self._compression_allowed(headers):
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.mw.minimum_size:
+                c = _Compressor(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+                body = c.process(body) + c.finish()
+                headers["Content-Encoding"] = self.encoding
+
+        if "content-length" in headers:
+            headers["Content-Length"] = str(len(body))
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": False})
@@ -0,0 +1,45 @@
+# app/core/metrics.py
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any, Dict, Sequence
+
+# seconds; tuned for request-path work (sub-ms cache hits up to multi-second stalls)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram (Prometheus-style, non-cumulative counts).
+
+    Values above the last bucket land in the "+Inf" bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "avg": round(self._sum / self._count, 6) if self._count else 0.0,
+                "max": round(self._max, 6),
+                "buckets": dict(zip(labels, self._counts)),
+            }
@@ -19,5 +19,7 @@ from app.db.models import file_asset      # noqa: F401
 from app.db.models import pub             # noqa: F401
 from app.db.models import restaurant      # noqa: F401
 from app.db.models import hotels          # noqa: F401
+from app.db.models import catalog_version # noqa: F401
+from app.db.models import sync_tombstone  # noqa: F401
 from app.db.models.order import Order
 from app.db.models.order_event import OrderEvent 
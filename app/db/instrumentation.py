@@ -0,0 +1,89 @@
+# app/db/instrumentation.py
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+
+# Collapse expanded IN-lists so `IN (%(a)s, %(b)s)` and `IN ($1, $2, $3)` share a shape
+_IN_LIST = re.compile(r"\(\s*(?:%\(\w+\)s|\$\d+|\?)(?:\s*,\s*(?:%\(\w+\)s|\$\d+|\?))*\s*\)")
+
+
+class RequestQueryStats:
+    """Queries issued while serving one request (shared across its threads/greenlets)."""
+
+    __slots__ = ("count", "db_time", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.db_time += elapsed
+        self.shapes[_IN_LIST.sub("(?)", statement)] += 1
+
+    def repeated(self, threshold: int):
+        return [(shape, n) for shape, n in self.shapes.items() if n > threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Count and time every cursor execution on `engine` (sync Engine or AsyncEngine.sync_engine)."""
+    if not settings.SQL_INSTRUMENTATION:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["_query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+
+def start_request() -> RequestQueryStats:
+    stats = RequestQueryStats()
+    _current.set(stats)
+    return stats
+
+
+def finish_request(request, response, stats: RequestQueryStats, elapsed: float) -> None:
+    """Emit Server-Timing + structured log fields, and warn on repeated statement shapes."""
+    db_ms = stats.db_time * 1000
+    response.headers.append(
+        "Server-Timing",
+        f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={elapsed * 1000:.1f}',
+    )
+
+    fields = {
+        "method": request.method,
+        "path": request.url.path,
+        "status": response.status_code,
+        "duration_ms": round(elapsed * 1000, 1),
+        "db_queries": stats.count,
+        "db_time_ms": round(db_ms, 1),
+    }
+    logger.info(" ".join(f"{k}={v}" for k, v in fields.items()), extra=fields)
+
+    for shape, n in stats.repeated(settings.SQL_REPEAT_WARN_THRESHOLD):
+        logger.warning(
+            "possible N+1: statement repeated %d times in %s %s: %s",
+            n, request.method, request.url.path, shape[:200],
+            extra={**fields, "repeat_count": n},
+        )
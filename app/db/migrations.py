@@ -0,0 +1,58 @@
+# app/db/migrations.py
+from __future__ import annotations
+
+import os
+from typing import Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ProgrammingError, OperationalError
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    cfg = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    # alembic.ini uses a cwd-relative script_location; pin it to the repo
+    cfg.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    return cfg
+
+
+def expected_heads() -> Set[str]:
+    """Head revision(s) of the migration scripts shipped with this build (no DB access)."""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(engine: Engine) -> Optional[Set[str]]:
+    """Revision(s) stamped in the database, or None if it was never migrated."""
+    with engine.connect() as conn:
+        try:
+            rows = conn.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+        except (ProgrammingError, OperationalError):
+            return None
+    return set(rows)
+
+
+def ensure_schema_current(engine: Engine) -> None:
+    """
+    Fail fast if the database is not at this build's Alembic head.
+
+    One cheap query; schema changes themselves are applied out of band with
+    `alembic upgrade head` (or `python create_tables.py` for a fresh dev DB).
+    """
+    expected = expected_heads()
+    current = current_revisions(engine)
+    if current is None:
+        raise RuntimeError(
+            "Database has no alembic_version table. Run `alembic upgrade head` "
+            "(or `python create_tables.py` for a fresh database) before starting the API."
+        )
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at {sorted(current) or 'base'} but this build expects "
+            f"{sorted(expected)}. Run `alembic upgrade head` before starting the API."
+        )
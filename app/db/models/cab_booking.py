@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Enum as SQLEnum, Numeric
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Enum as SQLEnum, Numeric, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -7,6 +7,7 @@ from app.db.base import Base
 
 
 class BookingStatus(str, enum.Enum):
+    SCHEDULED = "scheduled"  # waiting for its dispatch lead time (services/scheduler.py)
     PENDING = "pending"
     CONFIRMED = "confirmed"
     DRIVER_ASSIGNED = "driver_assigned"
@@ -23,6 +24,12 @@ class VehicleType(str, enum.Enum):
 
 class CabBooking(Base):
     __tablename__ = "cab_bookings"
+    __table_args__ = (
+        # booking history: newest first per crew member
+        Index("ix_cab_bookings_crew_id_created_at", "crew_id", "created_at", "id"),
+        # dispatch: oldest pending bookings first
+        Index("ix_cab_bookings_status_created_at", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     booking_id = Column(String, unique=True, index=True, nullable=False)  # CAB-XXXXXXXX
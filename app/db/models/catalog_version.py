@@ -0,0 +1,63 @@
+from sqlalchemy import Column, DateTime, Integer, String, event, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+
+# Tables served from per-process caches (services/catalog_cache.py, services/fares.py)
+CATALOG_TABLES = frozenset({"pubs", "hotels", "restaurants", "cab_pricing"})
+
+
+class CatalogVersion(Base):
+    """One row per catalog table; `version` is bumped by every write to that table."""
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<CatalogVersion {self.name}={self.version}>"
+
+
+def bump_catalog_versions(connection, names) -> None:
+    """Increment the version of each catalog, creating missing rows at 1."""
+    table = CatalogVersion.__table__
+    for name in sorted(names):
+        result = connection.execute(
+            update(table)
+            .where(table.c.name == name)
+            .values(version=table.c.version + 1, updated_at=func.now())
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1))
+
+
+def _note_changes(session: Session, names) -> None:
+    session.info.setdefault("catalog_changes", set()).update(names)
+
+
+# ---- Version bumps ----
+# Every ORM write to a catalog table (API, seed_*.py, admin scripts) bumps its
+# version in the same transaction, so caches in every worker see the change.
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, flush_context) -> None:
+    names = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__table__", None) is not None and obj.__table__.name in CATALOG_TABLES
+    }
+    if names:
+        bump_catalog_versions(session.connection(), names)
+        _note_changes(session, names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_write(orm_execute_state) -> None:
+    # query(...).delete() / update() bypass the flush
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.local_table.name in CATALOG_TABLES:
+        session = orm_execute_state.session
+        bump_catalog_versions(session.connection(), {mapper.local_table.name})
+        _note_changes(session, {mapper.local_table.name})
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, DateTime, JSON, ForeignKey, Numeric, Float, func, UniqueConstraint
+    Column, Integer, String, DateTime, JSON, ForeignKey, Numeric, Float, func, UniqueConstraint, Index
 )
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -9,6 +9,10 @@ class Order(Base):
     __table_args__ = (
         # one order per RFQ
         UniqueConstraint("rfq_id", name="uq_order_rfq"),
+        # list_orders: filter by buyer / vendor / status, ORDER BY id DESC
+        Index("ix_orders_buyer_user_id_id", "buyer_user_id", "id"),
+        Index("ix_orders_vendor_user_id_id", "vendor_user_id", "id"),
+        Index("ix_orders_status_id", "status", "id"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
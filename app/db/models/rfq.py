@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, func, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, JSON, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class RFQ(Base):
     __tablename__ = "rfqs"
+    __table_args__ = (
+        # vendor market / vendor RFQ list: port IN (...) ORDER BY id DESC
+        Index("ix_rfqs_port_id", "port", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
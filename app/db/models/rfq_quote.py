@@ -10,6 +10,7 @@ from sqlalchemy import (
     Float,
     func,
     UniqueConstraint,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -19,6 +20,8 @@ class RFQQuote(Base):
     __tablename__ = "rfq_quotes"
     __table_args__ = (
         UniqueConstraint("rfq_id", "vendor_user_id", name="uq_rfq_vendor_quote"),
+        # list_my_quotes: vendor_user_id = ? ORDER BY id DESC
+        Index("ix_rfq_quotes_vendor_user_id_id", "vendor_user_id", "id"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
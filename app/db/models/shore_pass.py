@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, func, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class ShorePass(Base):
     __tablename__ = "shore_passes"
+    __table_args__ = (
+        # current pass / history: newest first per crew member
+        Index("ix_shore_passes_crew_profile_id_created_at", "crew_profile_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     crew_profile_id = Column(Integer, ForeignKey("crew_profiles.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, event, insert
+
+from app.db.base import Base
+
+# Synced tables -> column holding the owning crew profile id. Keyed by table
+# name rather than model so this module (imported by app.db.base) does not
+# import the models that import app.db.base.
+SYNCED_TABLES = {"shore_passes": "crew_profile_id", "cab_bookings": "crew_id"}
+
+
+class SyncTombstone(Base):
+    """
+    Record of a deleted row, so /crew/sync can tell clients to drop it.
+
+    `owner_id` is the crew profile the row belonged to. Tombstones older than
+    SYNC_TOMBSTONE_RETENTION_DAYS are never read (clients that far behind get
+    a full resync) and can be deleted freely.
+    """
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_owner_id_deleted_at", "owner_id", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(64), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SyncTombstone {self.table_name}#{self.row_id}>"
+
+
+def _record(connection, table_name: str, row_id: int, owner_id: int) -> None:
+    connection.execute(
+        insert(SyncTombstone.__table__).values(
+            table_name=table_name,
+            row_id=row_id,
+            owner_id=owner_id,
+            deleted_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+# ---- Tombstones for synced tables ----
+# Written in the deleting transaction. Bulk query().delete() and FK cascades
+# bypass this hook.
+@event.listens_for(Base, "after_delete", propagate=True)
+def _synced_row_deleted(mapper, connection, target) -> None:
+    table_name = mapper.local_table.name
+    owner_column = SYNCED_TABLES.get(table_name)
+    if owner_column is not None:
+        _record(connection, table_name, target.id, getattr(target, owner_column))
@@ -12,6 +12,8 @@ class User(Base):
     mobile_number = Column(String(32), nullable=True)
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(32), nullable=False, server_default="crew")
+    # bumped to revoke every token issued so far (see services/principals.py)
+    token_version = Column(Integer, nullable=False, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
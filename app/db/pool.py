@@ -0,0 +1,105 @@
+# app/db/pool.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Histogram
+
+# checkout waits are normally ~0; anything visible means the pool is undersized
+_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """Counters and checkout wait-time histogram for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wait = Histogram(_WAIT_BUCKETS)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class _InstrumentedPoolMixin:
+    """Times `_do_get` (the part of a checkout that can block on a full pool)."""
+
+    _metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self._metrics is not None:
+                self._metrics.incr("timeouts")
+            raise
+        finally:
+            if self._metrics is not None:
+                self._metrics.wait.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same metrics
+        new_pool = super().recreate()
+        new_pool._metrics = self._metrics
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(engine, name: str) -> PoolMetrics:
+    """Attach a PoolMetrics to `engine` (sync Engine or AsyncEngine.sync_engine)."""
+    metrics = PoolMetrics(name)
+    engine.pool._metrics = metrics
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        metrics.incr("checkouts")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, conn_record):
+        metrics.incr("connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_conn, conn_record, exception):
+        metrics.incr("invalidations")
+
+    return metrics
+
+
+def pool_status(engine, metrics: PoolMetrics) -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    stats.update({
+        "checkouts": metrics.checkouts,
+        "connects": metrics.connects,
+        "invalidations": metrics.invalidations,
+        "timeouts": metrics.timeouts,
+        "checkout_wait_seconds": metrics.wait.snapshot(),
+    })
+    return stats
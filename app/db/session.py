@@ -2,10 +2,18 @@
 from __future__ import annotations
 
 import os
+import time
+from typing import Optional
+
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
 
 
 def _resolve_database_url() -> str:
@@ -45,16 +53,153 @@ def _resolve_database_url() -> str:
     return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}?sslmode={sslmode}"
 
 
+def _resolve_async_database_url(sync_url: str, override: Optional[str] = None) -> str:
+    """
+    Derive the asyncio driver URL from the sync one.
+
+    `override` (e.g. settings.ASYNC_DATABASE_URL) wins if set; otherwise
+    psycopg2 -> asyncpg (sslmode is translated to asyncpg's `ssl`) and
+    sqlite -> aiosqlite.
+    """
+    if override:
+        return override
+
+    u = make_url(sync_url)
+    backend = u.get_backend_name()
+    if backend == "postgresql":
+        query = dict(u.query)
+        sslmode = query.pop("sslmode", None)
+        if sslmode:
+            query["ssl"] = sslmode
+        u = u.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        u = u.set(drivername="sqlite+aiosqlite")
+    return u.render_as_string(hide_password=False)
+
+
+def _pool_options() -> dict:
+    """Pool sizing shared by both engines (each worker process gets its own pools)."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": str(settings.DB_POOL_PRE_PING).lower() != "never",
+    }
+
+
 # ---- Engine & Session ----
+# Sync engine: scripts (seed_*.py, create_tables.py) and the routers that
+# still run as sync `def` endpoints in the threadpool.
 DATABASE_URL = _resolve_database_url()
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, future=True)
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, future=True, **_pool_options())
+engine_pool_metrics = instrument_pool(engine, "primary")
+instrument_engine(engine)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Async engine: `async def` routers (rfqs, quotes, orders, crew) and auth.
+# expire_on_commit=False because lazy refreshes can't happen implicitly under
+# asyncio; routes refresh explicitly where they need server-side values.
+ASYNC_DATABASE_URL = _resolve_async_database_url(
+    DATABASE_URL, getattr(settings, "ASYNC_DATABASE_URL", None)
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **_pool_options()
+)
+async_engine_pool_metrics = instrument_pool(async_engine.sync_engine, "primary_async")
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# ---- Read replica (optional) ----
+# Without DATABASE_REPLICA_URL the replica names alias the primary, so read
+# dependencies behave exactly like get_db / get_async_db.
+REPLICA_DATABASE_URL = getattr(settings, "DATABASE_REPLICA_URL", None)
+if REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL, poolclass=InstrumentedQueuePool, future=True, **_pool_options()
+    )
+    replica_engine_pool_metrics = instrument_pool(replica_engine, "replica")
+    instrument_engine(replica_engine)
+    async_replica_engine = create_async_engine(
+        _resolve_async_database_url(REPLICA_DATABASE_URL),
+        poolclass=InstrumentedAsyncQueuePool,
+        **_pool_options(),
+    )
+    async_replica_engine_pool_metrics = instrument_pool(async_replica_engine.sync_engine, "replica_async")
+    instrument_engine(async_replica_engine.sync_engine)
+    ReplicaSessionLocal = sessionmaker(bind=replica_engine, autocommit=False, autoflush=False)
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+else:
+    replica_engine = None
+    async_replica_engine = None
+    ReplicaSessionLocal = SessionLocal
+    AsyncReplicaSessionLocal = AsyncSessionLocal
+
+
+# ---- Read-your-writes ----
+# A successful write marks the client (cookie) so that its reads go to the
+# primary until replication has most likely caught up. Clients that don't keep
+# cookies can send `X-Read-Consistency: primary` instead.
+READ_YOUR_WRITES_COOKIE = "omx_rw"
+READ_CONSISTENCY_HEADER = "x-read-consistency"
+_UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def _wants_primary(request: Request) -> bool:
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    marker = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        return marker is not None and float(marker) > time.time()
+    except ValueError:
+        return False
+
+
+def mark_recent_write(request: Request, response: Response) -> None:
+    """Called by the app middleware after each request."""
+    if replica_engine is None or request.method not in _UNSAFE_METHODS:
+        return
+    if response.status_code >= 400:
+        return
+    ttl = settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        str(time.time() + ttl),
+        max_age=ttl,
+        httponly=True,
+        samesite="lax",
+    )
 
-# ---- FastAPI dependency ----
+
+# ---- FastAPI dependencies ----
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints: replica unless the client just wrote."""
+    factory = SessionLocal if _wants_primary(request) else ReplicaSessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if _wants_primary(request) else AsyncReplicaSessionLocal
+    async with factory() as db:
+        yield db
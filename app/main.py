@@ -1,21 +1,35 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import logging
 import os
+import time
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.session import engine
+from app.db import instrumentation
+from app.db.session import SessionLocal, async_engine, async_replica_engine, engine, mark_recent_write
 from app.db.base import Base
+from app.db.migrations import ensure_schema_current
+from app.services.dispatch import DispatchLoop, dispatcher
+from app.services.password_hashing import password_hasher
+from app.services.scheduler import booking_scheduler
 
-from app.api.v1 import routes_auth, routes_contact, routes_files, routes_users, registration, routes_crew, routes_pubs, routes_hotels, routes_restaurants
+from app.api.v1 import routes_auth, routes_contact, routes_files, routes_users, registration, routes_crew, routes_pubs, routes_hotels, routes_restaurants, routes_search, routes_bundles, routes_dispatch, routes_internal
 
 from app.api.v1.routes_vendor import router as vendor_router
 from app.api.v1.routes_rfqs import router as rfq_router
 from app.api.v1 import routes_quotes 
 from app.api.v1 import routes_orders 
 
-app = FastAPI(title=settings.APP_NAME)
+logger = logging.getLogger("app")
+dispatch_loop = DispatchLoop(dispatcher, SessionLocal)
+
+# orjson renders datetimes, UUIDs and dataclasses natively and is several
+# times faster than the stdlib encoder on large lists
+app = FastAPI(title=settings.APP_NAME, default_response_class=ORJSONResponse)
 
 # --- CORS config ---
 origins = [
@@ -33,11 +47,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Startup event: ensure tables exist ---
+# --- SQL instrumentation: query count/time per request (Server-Timing + logs) ---
+if settings.SQL_INSTRUMENTATION:
+    @app.middleware("http")
+    async def sql_timing(request: Request, call_next):
+        stats = instrumentation.start_request()
+        started = time.perf_counter()
+        response = await call_next(request)
+        instrumentation.finish_request(request, response, stats, time.perf_counter() - started)
+        return response
+
+# --- Read-your-writes: route a client's reads to the primary right after it writes ---
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    mark_recent_write(request, response)
+    return response
+
+# --- Compression (gzip/br) and MessagePack negotiation; outermost, so it sees final bodies ---
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# --- Startup event: verify the schema (see DB_STARTUP_MODE) ---
 @app.on_event("startup")
 def on_startup():
-    # Base is already linked to all models via app/db/base.py imports
-    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    mode = settings.DB_STARTUP_MODE
+    if mode == "check":
+        ensure_schema_current(engine)
+    elif mode == "create_all":
+        # Base is already linked to all models via app/db/base.py imports
+        Base.metadata.create_all(bind=engine)
+    logger.info(
+        "startup schema step (%s) took %.1f ms", mode, (time.perf_counter() - started) * 1000,
+        extra={"db_startup_mode": mode},
+    )
+    if settings.DISPATCH_INTERVAL_SECONDS > 0:
+        dispatch_loop.start()
+    if settings.CAB_SCHEDULER_ENABLED:
+        booking_scheduler.start(engine, SessionLocal)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    dispatch_loop.stop()
+    booking_scheduler.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
 
 # --- Routes ---
 app.include_router(routes_auth.router,    prefix="/api/v1/auth",    tags=["authentication"])
@@ -53,6 +114,10 @@ app.include_router(routes_crew.router,     prefix="/api/v1/crew",         tags=[
 app.include_router(routes_pubs.router,     prefix="/api/v1/pubs",         tags=["pubs"])
 app.include_router(routes_hotels.router,   prefix="/api/v1/hotels",       tags=["hotels"])
 app.include_router(routes_restaurants.router, prefix="/api/v1/restaurants",   tags=["restaurants"])
+app.include_router(routes_search.router,   prefix="/api/v1/search",       tags=["search"])
+app.include_router(routes_bundles.router,  prefix="/api/v1/bundles",      tags=["bundles"])
+app.include_router(routes_dispatch.router, prefix="/api/v1/dispatch",     tags=["dispatch"], include_in_schema=False)
+app.include_router(routes_internal.router, prefix="/api/v1/internal", tags=["internal"], include_in_schema=False)
 
 
 
@@ -1,13 +1,17 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
-from datetime import datetime, timedelta
-from jose import jwt, JWTError
 
 ALGORITHM = "HS256"
 
+# claims that make a token self-describing (see issue_access_token)
+CLAIMS_KEYS = ("uid", "role", "ver")
+
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -17,23 +21,72 @@ def verify_password(plain: str, hashed: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = {"sub": subject}
+def create_access_token(
+    subject: str,
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
+) -> str:
+    to_encode = {"sub": subject, **(claims or {})}
     expire = datetime.utcnow() + (expires_delta or timedelta(weeks=2))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
-def verify_token(token: str) -> Optional[str]:
+def issue_access_token(user) -> str:
+    """
+    Issue the login/signup token for `user`.
+
+    With AUTH_CLAIMS_TOKENS enabled the token also carries `uid`, `role` and
+    the user's current `ver` (token_version), which lets claims-aware
+    dependencies skip the users lookup entirely.
+    """
+    claims = None
+    if settings.AUTH_CLAIMS_TOKENS:
+        claims = {"uid": user.id, "role": user.role, "ver": user.token_version or 0}
+    return create_access_token(
+        subject=user.email,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        claims=claims,
+    )
+
+# sha256(token) -> verified payload. Only valid tokens are cached, and each
+# entry expires with the token's own `exp`.
+_token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+def decode_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Verify `token` and return its payload, or None if invalid/expired."""
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+
+    payload = _token_cache.get(key)
+    if payload is not None:
+        if payload["exp"] > now:
+            return dict(payload)
+        _token_cache.pop(key)
+        return None
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload.get("sub")
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _token_cache.set(key, payload, ttl=exp - now)
+    return dict(payload)
+
+def token_cache_stats() -> Dict[str, Any]:
+    return _token_cache.stats()
+
+def has_claims(payload: Dict[str, Any]) -> bool:
+    return all(payload.get(k) is not None for k in CLAIMS_KEYS)
+
+def verify_token(token: str) -> Optional[str]:
+    payload = decode_claims(token)
+    return payload.get("sub") if payload else None
 
 
 def decode_subject(token: str) -> Optional[str]:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
-    except JWTError:
-        return None
\ No newline at end of file
+    payload = decode_claims(token)
+    return payload.get("sub") if payload else None
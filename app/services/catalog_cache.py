@@ -0,0 +1,205 @@
+# app/services/catalog_cache.py
+"""
+Per-process read-through cache for the pubs / hotels / restaurants catalogs.
+
+Each table is loaded once into plain dicts (the shape the endpoints already
+return) plus one `array('d')` per numeric filter column, so distance / price /
+rating filters are a scan over packed floats instead of a query. A GeoGrid
+over lat/lng (services/geo.py) answers "within r km / k nearest" queries.
+
+Freshness: the `catalog_versions` row for a table is bumped in the same
+transaction as any write to it (see db/models/catalog_version.py). A worker
+re-reads that single row at most every CATALOG_CACHE_CHECK_SECONDS and
+reloads the table when it moved; commits in this process mark the cache
+stale immediately.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.catalog_version import CatalogVersion
+from app.db.models.hotels import Hotel
+from app.db.models.pub import Pub
+from app.db.models.restaurant import Restaurant
+from app.services.geo import GeoGrid
+
+
+@dataclass(frozen=True)
+class NearQuery:
+    lat: float
+    lng: float
+    radius_km: Optional[float] = None
+    k: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    version: int
+    rows: List[dict]
+    by_id: Dict[int, dict]
+    columns: Dict[str, array]
+    geo: GeoGrid
+
+
+class CatalogCache:
+    """
+    Rows are shared between requests: treat them as read-only.
+    """
+
+    def __init__(self, model, numeric_columns: Sequence[str]):
+        self.model = model
+        self.name = model.__tablename__
+        self.numeric_columns = tuple(numeric_columns)
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._refreshing = threading.Lock()
+        self.loads = 0
+        self.checks = 0
+
+    # ---- freshness ----
+    def mark_stale(self) -> None:
+        self._checked_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._checked_at < settings.CATALOG_CACHE_CHECK_SECONDS
+        )
+
+    def snapshot(self, db: Session) -> _Snapshot:
+        if self._is_fresh():
+            return self._snapshot
+        # Never wait on a lock around the query: /crew/sync calls this through
+        # AsyncSession.run_sync, on the event loop thread. One caller refreshes
+        # while the others keep the current snapshot; only a cold cache makes
+        # them query too.
+        refreshing = self._refreshing.acquire(blocking=False)
+        if not refreshing and self._snapshot is not None:
+            return self._snapshot
+        try:
+            self.checks += 1
+            version = db.scalar(
+                select(CatalogVersion.version).where(CatalogVersion.name == self.name)
+            ) or 0
+            snap = self._snapshot
+            if snap is None or snap.version != version:
+                snap = self._snapshot = self._load(db, version)
+            self._checked_at = time.monotonic()
+            return snap
+        finally:
+            if refreshing:
+                self._refreshing.release()
+
+    def _load(self, db: Session, version: int) -> _Snapshot:
+        table = self.model.__table__
+        rows = [dict(r) for r in db.execute(select(table).order_by(table.c.id)).mappings()]
+        self.loads += 1
+        return _Snapshot(
+            version=version,
+            rows=rows,
+            by_id={r["id"]: r for r in rows},
+            columns={c: array("d", (r[c] for r in rows)) for c in self.numeric_columns},
+            geo=GeoGrid([r["lat"] for r in rows], [r["lng"] for r in rows]),
+        )
+
+    # ---- reads ----
+    def all(self, db: Session) -> List[dict]:
+        return self.snapshot(db).rows
+
+    def get(self, db: Session, row_id: int) -> Optional[dict]:
+        return self.snapshot(db).by_id.get(row_id)
+
+    @staticmethod
+    def _matching(snap: _Snapshot, le, ge) -> Optional[List[int]]:
+        """Indices passing every bound, or None when there are no bounds."""
+        bounds = [(snap.columns[c], v, True) for c, v in (le or {}).items() if v is not None]
+        bounds += [(snap.columns[c], v, False) for c, v in (ge or {}).items() if v is not None]
+        if not bounds:
+            return None
+
+        idx = range(len(snap.rows))
+        for col, bound, upper in bounds:
+            if upper:
+                idx = [i for i in idx if col[i] <= bound]
+            else:
+                idx = [i for i in idx if col[i] >= bound]
+        return idx
+
+    def filter(
+        self,
+        db: Session,
+        le: Optional[Dict[str, Optional[float]]] = None,
+        ge: Optional[Dict[str, Optional[float]]] = None,
+        near: Optional[NearQuery] = None,
+    ) -> List[dict]:
+        """
+        Rows with column <= bound for each `le` entry and >= bound for each `ge`
+        entry (None = no bound). With `near`, only rows inside the radius / among
+        the k nearest, closest first, each copied with a `distance_km` key.
+        """
+        snap = self.snapshot(db)
+        idx = self._matching(snap, le, ge)
+        if near is None:
+            return snap.rows if idx is None else [snap.rows[i] for i in idx]
+
+        allowed = None if idx is None else set(idx)
+        if near.k is None:
+            hits = snap.geo.within(near.lat, near.lng, near.radius_km, allowed)
+        else:
+            hits = snap.geo.nearest(near.lat, near.lng, near.k, near.radius_km, allowed)
+        return [{**snap.rows[i], "distance_km": round(d, 3)} for d, i in hits]
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            "rows": len(snap.rows) if snap else 0,
+            "version": snap.version if snap else None,
+            "loads": self.loads,
+            "version_checks": self.checks,
+        }
+
+
+pubs_cache = CatalogCache(Pub, ("distance_from_port", "rating", "price_per_person"))
+hotels_cache = CatalogCache(Hotel, ("distance_from_port", "rating", "price_per_night"))
+restaurants_cache = CatalogCache(Restaurant, ("distance_from_port", "rating", "price_per_person"))
+
+_CACHES = {c.name: c for c in (pubs_cache, hotels_cache, restaurants_cache)}
+# table -> called when a local commit wrote to it; other version-tracked
+# caches (e.g. cab pricing in services/fares.py) add theirs
+_STALE_HOOKS: Dict[str, Callable[[], None]] = {name: c.mark_stale for name, c in _CACHES.items()}
+
+
+def register_stale_hook(table_name: str, mark_stale: Callable[[], None]) -> None:
+    _STALE_HOOKS[table_name] = mark_stale
+
+
+def snapshot_all(db: Session) -> Dict[str, _Snapshot]:
+    """Current snapshot of every catalog, keyed by table name."""
+    return {name: cache.snapshot(db) for name, cache in _CACHES.items()}
+
+
+def catalog_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _CACHES.items()}
+
+
+# ---- Local invalidation ----
+# Writes made by this process are visible on the next read, not after the
+# check interval. The version bump itself happens in catalog_version.py.
+@event.listens_for(Session, "after_commit")
+def _expire_on_commit(session: Session) -> None:
+    for name in session.info.pop("catalog_changes", ()):
+        if name in _STALE_HOOKS:
+            _STALE_HOOKS[name]()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop("catalog_changes", None)
@@ -0,0 +1,430 @@
+# app/services/dispatch.py
+"""
+Driver dispatch for pending cab bookings.
+
+Drivers: the fleet feed pushes driver positions to /api/v1/dispatch/drivers.
+Available drivers live in an in-memory DriverIndex, a lat/lng grid of
+cells -> driver ids updated in place as positions arrive (GeoGrid, by
+contrast, is built once). A position older than DISPATCH_DRIVER_TTL_SECONDS
+means the driver is offline; such drivers are skipped and evicted. An
+assigned driver is busy: position updates for them are ignored until the
+feed releases them (trip over) or takes them off shift.
+
+Matching: a round takes up to DISPATCH_BATCH_SIZE pending bookings, oldest
+first (scheduled bookings become pending at their lead time, see
+services/scheduler.py), and looks up each one's DISPATCH_CANDIDATES nearest eligible drivers
+(same vehicle type, enough seats, within DISPATCH_MAX_PICKUP_KM). The
+candidate pairs of the whole batch are then assigned greedily by pickup
+distance, closest first, each booking and driver used once. A booking whose
+candidates all went to closer bookings waits for the next round. Rounds
+walk the pending queue a batch at a time (keyset on created_at, id) and
+start over from the oldest at its end, so a batch nobody can serve yet does
+not hide the bookings behind it.
+
+Writes: one UPDATE ... FROM (VALUES ...) per round, conditional on the
+booking still being pending, so a booking cancelled in the meantime (or
+taken by another worker) is skipped and its driver returns to the pool.
+
+The index is per process: dispatch runs in the process that receives the
+driver feed (the single `web` process in procfile).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Integer, String, column, select, tuple_, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.cab_booking import BookingStatus, CabBooking
+from app.services.geo import KM_PER_DEG_LAT, haversine_km
+
+logger = logging.getLogger("app.dispatch")
+
+DRIVER_CELL_DEG = 0.02  # ~2.2 km
+
+
+@dataclass(frozen=True)
+class Driver:
+    driver_id: str
+    name: str
+    phone: str
+    vehicle_type: str
+    seats: int
+    lat: float
+    lng: float
+    seen_at: float = 0.0  # time.monotonic() of the last position
+
+
+@dataclass(frozen=True)
+class PendingBooking:
+    id: int
+    vehicle_type: str
+    num_passengers: int
+    lat: float
+    lng: float
+    created_at: Optional[datetime] = None  # keyset position in the pending queue
+
+
+@dataclass(frozen=True)
+class Assignment:
+    booking_id: int
+    driver: Driver
+    pickup_km: float
+
+
+@dataclass(frozen=True)
+class DispatchRound:
+    pending: int
+    assigned: int
+    unmatched: int
+    conflicts: int
+    match_ms: float
+    total_ms: float
+
+
+class DriverIndex:
+    """Available drivers, bucketed by grid cell, plus the ids of busy drivers. Thread-safe."""
+
+    def __init__(self, cell_deg: float = DRIVER_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.n_cols = max(1, int(round(360.0 / cell_deg)))
+        self._drivers: Dict[str, Driver] = {}
+        self._cell_of: Dict[str, Tuple[int, int]] = {}
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+        self._busy: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._drivers)
+
+    @property
+    def busy_count(self) -> int:
+        return len(self._busy)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (
+            math.floor((lat + 90.0) / self.cell_deg),
+            math.floor((lng + 180.0) / self.cell_deg) % self.n_cols,
+        )
+
+    def _discard(self, driver_id: str) -> Optional[Driver]:
+        driver = self._drivers.pop(driver_id, None)
+        if driver is not None:
+            cell = self._cell_of.pop(driver_id)
+            bucket = self._cells[cell]
+            bucket.discard(driver_id)
+            if not bucket:
+                del self._cells[cell]
+        return driver
+
+    def upsert(self, driver: Driver) -> bool:
+        """Add or move an available driver. -> False if the driver is busy (ignored)."""
+        with self._lock:
+            if driver.driver_id in self._busy:
+                return False
+            self._discard(driver.driver_id)
+            cell = self._cell(driver.lat, driver.lng)
+            self._drivers[driver.driver_id] = driver
+            self._cell_of[driver.driver_id] = cell
+            self._cells.setdefault(cell, set()).add(driver.driver_id)
+            return True
+
+    def upsert_many(self, drivers: Iterable[Driver]) -> int:
+        return sum(self.upsert(driver) for driver in drivers)
+
+    def remove(self, driver_id: str) -> Optional[Driver]:
+        """Take a driver out of the pool and forget any busy mark (off shift)."""
+        with self._lock:
+            self._busy.discard(driver_id)
+            return self._discard(driver_id)
+
+    def reserve(self, driver_id: str) -> Optional[Driver]:
+        """Take an available driver out of the pool and mark them busy."""
+        with self._lock:
+            driver = self._discard(driver_id)
+            if driver is not None:
+                self._busy.add(driver_id)
+            return driver
+
+    def release(self, driver_id: str) -> bool:
+        """Trip over: the driver's next position makes them available again."""
+        with self._lock:
+            if driver_id not in self._busy:
+                return False
+            self._busy.discard(driver_id)
+            return True
+
+    def evict_stale(self, now: Optional[float] = None) -> int:
+        cutoff = (now or time.monotonic()) - settings.DISPATCH_DRIVER_TTL_SECONDS
+        with self._lock:
+            stale = [d.driver_id for d in self._drivers.values() if d.seen_at < cutoff]
+            for driver_id in stale:
+                self._discard(driver_id)
+        return len(stale)
+
+    def _ring(self, center: Tuple[int, int], r: int) -> Iterable[Tuple[int, int]]:
+        ci, cj = center
+        if r == 0:
+            yield center
+            return
+        for di in range(-r, r + 1):
+            if abs(di) == r:
+                for dj in range(-r, r + 1):
+                    yield ci + di, (cj + dj) % self.n_cols
+            else:
+                yield ci + di, (cj - r) % self.n_cols
+                yield ci + di, (cj + r) % self.n_cols
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        vehicle_type: str,
+        seats: int,
+        k: int,
+        max_km: float,
+        now: Optional[float] = None,
+    ) -> List[Tuple[float, Driver]]:
+        """Up to k eligible, fresh drivers within max_km, nearest first."""
+        cutoff = (now or time.monotonic()) - settings.DISPATCH_DRIVER_TTL_SECONDS
+        center = self._cell(lat, lng)
+        found: List[Tuple[float, Driver]] = []
+        with self._lock:
+            r = 0
+            while True:
+                for cell in self._ring(center, r):
+                    for driver_id in self._cells.get(cell, ()):
+                        d = self._drivers[driver_id]
+                        if d.vehicle_type != vehicle_type or d.seats < seats or d.seen_at < cutoff:
+                            continue
+                        km = haversine_km(lat, lng, d.lat, d.lng)
+                        if km <= max_km:
+                            found.append((km, d))
+                # nothing outside rings 0..r is closer than this
+                worst_lat = min(89.9, abs(lat) + self.cell_deg * (r + 1))
+                clearance = self.cell_deg * r * KM_PER_DEG_LAT * math.cos(math.radians(worst_lat))
+                if clearance > max_km or (len(found) >= k and sorted(found, key=_km)[k - 1][0] <= clearance):
+                    break
+                r += 1
+        found.sort(key=_km)
+        return found[:k]
+
+
+def _km(hit: Tuple[float, Driver]) -> float:
+    return hit[0]
+
+
+def match(
+    bookings: List[PendingBooking],
+    index: DriverIndex,
+    k: Optional[int] = None,
+    max_km: Optional[float] = None,
+    now: Optional[float] = None,
+) -> List[Assignment]:
+    """Greedy batch assignment: closest booking/driver pairs first."""
+    k = k or settings.DISPATCH_CANDIDATES
+    max_km = max_km or settings.DISPATCH_MAX_PICKUP_KM
+    edges = []
+    for order, b in enumerate(bookings):
+        for km, driver in index.nearest(b.lat, b.lng, b.vehicle_type, b.num_passengers, k, max_km, now):
+            edges.append((km, order, b.id, driver))
+    # distance ties go to the older booking
+    edges.sort(key=lambda e: (e[0], e[1]))
+
+    taken_bookings: Set[int] = set()
+    taken_drivers: Set[str] = set()
+    out = []
+    for km, _, booking_id, driver in edges:
+        if booking_id in taken_bookings or driver.driver_id in taken_drivers:
+            continue
+        taken_bookings.add(booking_id)
+        taken_drivers.add(driver.driver_id)
+        out.append(Assignment(booking_id, driver, km))
+    return out
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+class Dispatcher:
+    """
+    One matching round at a time. `_pending` and `_assign` are the only
+    database touch points, so a simulation can replace them (simulate_dispatch.py).
+    """
+
+    def __init__(self, index: DriverIndex):
+        self.index = index
+        self._lock = threading.Lock()
+        self.rounds = 0
+        self.assigned = 0
+        self.unmatched = 0
+        self.conflicts = 0
+        self._match_ms: Deque[float] = deque(maxlen=1000)
+        self._round_ms: Deque[float] = deque(maxlen=1000)
+        self._throughput: Deque[Tuple[int, float]] = deque(maxlen=100)  # (assigned, seconds)
+        self._after: Optional[PendingBooking] = None  # last booking of the previous full batch
+
+    # ---- database ----
+    def _pending(self, db: Session, limit: int, after: Optional[PendingBooking] = None) -> List[PendingBooking]:
+        """Oldest pending bookings, starting after `after` in (created_at, id) order."""
+        stmt = (
+            select(
+                CabBooking.id, CabBooking.vehicle_type, CabBooking.num_passengers,
+                CabBooking.pickup_lat, CabBooking.pickup_lng, CabBooking.created_at,
+            )
+            .where(CabBooking.status == BookingStatus.PENDING)
+            .order_by(CabBooking.created_at, CabBooking.id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(CabBooking.created_at, CabBooking.id) > tuple_(after.created_at, after.id))
+        rows = db.execute(stmt).all()
+        return [
+            PendingBooking(r.id, r.vehicle_type.value, r.num_passengers, r.pickup_lat, r.pickup_lng, r.created_at)
+            for r in rows
+        ]
+
+    def _assign(self, db: Session, assignments: List[Assignment]) -> Set[int]:
+        """Write the assignments in one statement. -> ids of bookings actually assigned."""
+        if not assignments:
+            return set()
+        data = values(
+            column("booking_id", Integer), column("driver_name", String), column("driver_phone", String),
+            name="assignments",
+        ).data([(a.booking_id, a.driver.name, a.driver.phone) for a in assignments])
+        assigned = db.execute(
+            update(CabBooking)
+            .where(CabBooking.id == data.c.booking_id, CabBooking.status == BookingStatus.PENDING)
+            .values(
+                status=BookingStatus.DRIVER_ASSIGNED,
+                driver_name=data.c.driver_name,
+                driver_phone=data.c.driver_phone,
+                updated_at=datetime.utcnow(),  # /crew/sync picks the change up
+            )
+            .returning(CabBooking.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        return set(assigned)
+
+    # ---- rounds ----
+    def run_once(self, db: Session) -> DispatchRound:
+        with self._lock:
+            started = time.perf_counter()
+            now = time.monotonic()
+            self.index.evict_stale(now)
+            limit = settings.DISPATCH_BATCH_SIZE
+            bookings = self._pending(db, limit, self._after) if len(self.index) else []
+            # next round takes the batch behind this one; past the end, start over
+            self._after = bookings[-1] if len(bookings) >= limit else None
+
+            matched_at = time.perf_counter()
+            assignments = match(bookings, self.index, now=now)
+            match_s = time.perf_counter() - matched_at
+
+            # reserve the drivers first: position updates from here on must not re-add them
+            reserved = [a for a in assignments if self.index.reserve(a.driver.driver_id) is not None]
+            try:
+                done = self._assign(db, reserved)
+            except Exception:
+                self._unreserve(a.driver for a in reserved)
+                raise
+            conflicts = [a for a in reserved if a.booking_id not in done]
+            # booking cancelled or taken meanwhile: the driver is free again
+            self._unreserve(replace(a.driver, seen_at=now) for a in conflicts)
+
+            total_s = time.perf_counter() - started
+            result = DispatchRound(
+                pending=len(bookings),
+                assigned=len(done),
+                unmatched=len(bookings) - len(done),
+                conflicts=len(conflicts),
+                match_ms=round(match_s * 1000, 3),
+                total_ms=round(total_s * 1000, 3),
+            )
+            self.rounds += 1
+            self.assigned += result.assigned
+            self.unmatched += result.unmatched
+            self.conflicts += result.conflicts
+            if bookings:
+                self._match_ms.append(match_s * 1000)
+                self._round_ms.append(total_s * 1000)
+                self._throughput.append((result.assigned, total_s))
+            return result
+
+    def _unreserve(self, drivers: Iterable[Driver]) -> None:
+        for driver in drivers:
+            self.index.release(driver.driver_id)
+            self.index.upsert(driver)
+
+    def stats(self) -> dict:
+        assigned = sum(n for n, _ in self._throughput)
+        seconds = sum(s for _, s in self._throughput)
+        return {
+            "drivers_available": len(self.index),
+            "drivers_busy": self.index.busy_count,
+            "rounds": self.rounds,
+            "assigned": self.assigned,
+            "unmatched": self.unmatched,
+            "conflicts": self.conflicts,
+            "match_ms_p50": _percentile(self._match_ms, 0.5),
+            "match_ms_p95": _percentile(self._match_ms, 0.95),
+            "round_ms_p50": _percentile(self._round_ms, 0.5),
+            "round_ms_p95": _percentile(self._round_ms, 0.95),
+            "assignments_per_s": round(assigned / seconds, 1) if seconds else None,
+        }
+
+
+class DispatchLoop:
+    """Background thread running a round every DISPATCH_INTERVAL_SECONDS."""
+
+    def __init__(self, dispatcher: Dispatcher, session_factory):
+        self.dispatcher = dispatcher
+        self.session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="dispatch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            progressed = False
+            db = self.session_factory()
+            try:
+                result = self.dispatcher.run_once(db)
+                # go again right away only while rounds assign something; a
+                # batch nobody can serve yet waits for new driver positions
+                progressed = result.assigned > 0
+            except Exception:
+                logger.exception("dispatch round failed")
+                db.rollback()
+            finally:
+                db.close()
+            if not progressed:
+                self._stop.wait(settings.DISPATCH_INTERVAL_SECONDS)
+
+
+driver_index = DriverIndex()
+dispatcher = Dispatcher(driver_index)
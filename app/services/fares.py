@@ -0,0 +1,227 @@
+# app/services/fares.py
+"""
+Cab fares: a per-process copy of the `cab_pricing` table and batch pricing.
+
+The table is tiny and changes rarely, so it is held as one packed
+`array('d')` per fare column and refreshed the same way as the catalog
+cache: writes bump the `cab_pricing` row in catalog_versions, and each
+worker re-reads that row at most every CATALOG_CACHE_CHECK_SECONDS (local
+commits apply immediately).
+
+`price_matrix()` prices a whole batch of distances for every vehicle type
+column by column: one pass per vehicle type over a packed array of
+distances, with no per-pair objects.
+
+Fare tokens: each single estimate carries an HMAC-signed quote (route,
+vehicle type, price, distance, expiry). /crew/cab/book verifies it and
+books at the quoted price, so the booking path needs neither the pricing
+table nor a route search, and cannot be fed a client-made price. Tokens
+are stateless and not bound to a booking: replaying one within
+FARE_TOKEN_TTL_SECONDS is accepted and books the same trip again at the
+price it states, which is the price the server quoted for that trip.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.cab_pricing import CabPricing
+from app.db.models.catalog_version import CatalogVersion
+from app.services.catalog_cache import register_stale_hook
+
+# Served while the cab_pricing table is empty: (type, name, base, per km, minimum)
+DEFAULT_PRICING = (
+    ("ac", "Cab AC", 50.0, 15.0, 100.0),
+    ("premium", "Cab Premium AC", 80.0, 22.0, 180.0),
+    ("xl", "Cab XL AC", 120.0, 30.0, 250.0),
+)
+
+
+@dataclass(frozen=True)
+class PricingTable:
+    version: int
+    vehicle_types: Tuple[str, ...]
+    names: Tuple[str, ...]
+    base_fare: array
+    per_km_rate: array
+    minimum_fare: array
+
+    @classmethod
+    def from_rows(cls, version: int, rows: Sequence[tuple]) -> "PricingTable":
+        return cls(
+            version=version,
+            vehicle_types=tuple(r[0] for r in rows),
+            names=tuple(r[1] for r in rows),
+            base_fare=array("d", (r[2] for r in rows)),
+            per_km_rate=array("d", (r[3] for r in rows)),
+            minimum_fare=array("d", (r[4] for r in rows)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.vehicle_types)
+
+    def price(self, i: int, distance_km: float) -> float:
+        return round(max(self.base_fare[i] + distance_km * self.per_km_rate[i], self.minimum_fare[i]), 2)
+
+
+def price_matrix(table: PricingTable, distances_km: Sequence[float]) -> List[List[float]]:
+    """Fares for every distance, one list per vehicle type (table order)."""
+    d = array("d", distances_km)
+    out = []
+    for base, rate, minimum in zip(table.base_fare, table.per_km_rate, table.minimum_fare):
+        out.append([round(max(base + x * rate, minimum), 2) for x in d])
+    return out
+
+
+class PricingCache:
+    name = CabPricing.__tablename__
+
+    def __init__(self):
+        self._table: Optional[PricingTable] = None
+        self._checked_at = 0.0
+        self._refreshing = threading.Lock()
+        self.loads = 0
+
+    def mark_stale(self) -> None:
+        self._checked_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._table is not None
+            and time.monotonic() - self._checked_at < settings.CATALOG_CACHE_CHECK_SECONDS
+        )
+
+    def table(self, db: Session) -> PricingTable:
+        if self._is_fresh():
+            return self._table
+        # Never wait on a lock around the query: under AsyncSession.run_sync it
+        # runs on the event loop thread. One caller refreshes while the others
+        # keep the current table; only a cold cache makes them query too.
+        refreshing = self._refreshing.acquire(blocking=False)
+        if not refreshing and self._table is not None:
+            return self._table
+        try:
+            version = db.scalar(
+                select(CatalogVersion.version).where(CatalogVersion.name == self.name)
+            ) or 0
+            table = self._table
+            if table is None or table.version != version:
+                table = self._table = self._load(db, version)
+            self._checked_at = time.monotonic()
+            return table
+        finally:
+            if refreshing:
+                self._refreshing.release()
+
+    def _load(self, db: Session, version: int) -> PricingTable:
+        rows = db.execute(
+            select(
+                CabPricing.vehicle_type,
+                CabPricing.vehicle_type,  # no display name column yet
+                CabPricing.base_fare,
+                CabPricing.per_km_rate,
+                CabPricing.minimum_fare,
+            ).order_by(CabPricing.id)
+        ).all()
+        self.loads += 1
+        return PricingTable.from_rows(version, rows or DEFAULT_PRICING)
+
+    def stats(self) -> dict:
+        table = self._table
+        return {
+            "vehicle_types": len(table) if table else 0,
+            "version": table.version if table else None,
+            "loads": self.loads,
+        }
+
+
+pricing_cache = PricingCache()
+register_stale_hook(pricing_cache.name, pricing_cache.mark_stale)
+
+
+# ---- Fare tokens ----
+@dataclass(frozen=True)
+class FareQuote:
+    vehicle_type: str
+    pickup: Tuple[float, float]
+    drop: Tuple[float, float]
+    price: float
+    distance_km: float
+    expires_at: int
+
+
+def _point(lat: float, lng: float) -> Tuple[float, float]:
+    # ~10 cm: tolerates float round-trips through JSON clients
+    return round(lat, 6), round(lng, 6)
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(body: bytes) -> bytes:
+    key = (settings.FARE_TOKEN_SECRET or settings.SECRET_KEY).encode()
+    # separate from JWT signing even when the secret is shared
+    return hmac.new(key, b"fare:" + body, hashlib.sha256).digest()
+
+
+def issue_fare_token(
+    vehicle_type: str,
+    pickup: Tuple[float, float],
+    drop: Tuple[float, float],
+    price: float,
+    distance_km: float,
+) -> str:
+    body = orjson.dumps({
+        "v": vehicle_type,
+        "p": _point(*pickup),
+        "d": _point(*drop),
+        "f": price,
+        "km": round(distance_km, 2),
+        "exp": int(time.time()) + settings.FARE_TOKEN_TTL_SECONDS,
+    })
+    return f"{_b64(body)}.{_b64(_signature(body))}"
+
+
+def verify_fare_token(token: str) -> Optional[FareQuote]:
+    """The quote in `token`, or None if it is malformed, forged or expired."""
+    try:
+        body_part, sig_part = token.split(".")
+        body = _unb64(body_part)
+        if not hmac.compare_digest(_unb64(sig_part), _signature(body)):
+            return None
+        data = orjson.loads(body)
+        quote = FareQuote(
+            vehicle_type=data["v"],
+            pickup=tuple(data["p"]),
+            drop=tuple(data["d"]),
+            price=data["f"],
+            distance_km=data["km"],
+            expires_at=data["exp"],
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+    return quote if quote.expires_at > time.time() else None
+
+
+def quote_matches(quote: FareQuote, vehicle_type: str, pickup: Tuple[float, float], drop: Tuple[float, float]) -> bool:
+    return (
+        quote.vehicle_type == vehicle_type
+        and quote.pickup == _point(*pickup)
+        and quote.drop == _point(*drop)
+    )
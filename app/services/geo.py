@@ -0,0 +1,150 @@
+# app/services/geo.py
+"""
+In-memory spatial index for catalog coordinates (no PostGIS).
+
+Points are bucketed into a fixed lat/lng grid. A query only looks at the
+cells around the query point, then computes exact haversine distances for
+those candidates in one pass over precomputed radian/cosine arrays.
+Nearest-k searches widen ring by ring until no unexplored cell can hold
+anything closer than the current k-th result.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+DEFAULT_CELL_DEG = 0.05  # ~5.5 km of latitude
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat = p2 - p1
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGrid:
+    def __init__(self, lats: Sequence[float], lngs: Sequence[float], cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.n_cols = max(1, int(round(360.0 / cell_deg)))
+        self._lat_r = array("d", (math.radians(v) for v in lats))
+        self._lng_r = array("d", (math.radians(v) for v in lngs))
+        self._cos_lat = array("d", (math.cos(v) for v in self._lat_r))
+        self._cells: Dict[Tuple[int, int], array] = {}
+        for i, (lat, lng) in enumerate(zip(lats, lngs)):
+            self._cells.setdefault(self._cell(lat, lng), array("l")).append(i)
+
+    def __len__(self) -> int:
+        return len(self._lat_r)
+
+    def cells(self) -> Dict[Tuple[int, int], List[int]]:
+        """Occupied cells -> point indices (for exporting the index)."""
+        return {cell: list(idx) for cell, idx in self._cells.items()}
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (
+            math.floor((lat + 90.0) / self.cell_deg),
+            math.floor((lng + 180.0) / self.cell_deg) % self.n_cols,
+        )
+
+    def _ring(self, center: Tuple[int, int], r: int) -> Iterable[Tuple[int, int]]:
+        ci, cj = center
+        if r == 0:
+            yield center
+            return
+        cols = range(cj - r, cj + r + 1) if 2 * r + 1 < self.n_cols else range(self.n_cols)
+        for di in range(-r, r + 1):
+            edge_row = abs(di) == r
+            for j in cols:
+                if edge_row or abs(j - cj) == r:
+                    yield ci + di, j % self.n_cols
+
+    def _distances(self, lat: float, lng: float, idx: Iterable[int]) -> List[Tuple[float, int]]:
+        """Exact haversine for a batch of candidate indices."""
+        qlat, qlng = math.radians(lat), math.radians(lng)
+        qcos = math.cos(qlat)
+        lat_r, lng_r, cos_lat = self._lat_r, self._lng_r, self._cos_lat
+        sin, asin, sqrt = math.sin, math.asin, math.sqrt
+        out = []
+        for i in idx:
+            a = sin((lat_r[i] - qlat) / 2) ** 2 + qcos * cos_lat[i] * sin((lng_r[i] - qlng) / 2) ** 2
+            out.append((2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a))), i))
+        return out
+
+    def _ring_clearance_km(self, lat: float, r: int) -> float:
+        """Lower bound on the distance to any point outside rings 0..r."""
+        reach = self.cell_deg * r
+        worst_lat = min(89.9, abs(lat) + reach + self.cell_deg)
+        return reach * KM_PER_DEG_LAT * min(1.0, math.cos(math.radians(worst_lat)))
+
+    def _ring_is_sparse(self, r: int) -> bool:
+        """Ring r has more cells than the grid has occupied ones: scanning everything is cheaper."""
+        return 8 * r > len(self._cells)
+
+    def _scan_all(self, lat: float, lng: float, allowed: Optional[Set[int]]) -> List[Tuple[float, int]]:
+        idx = range(len(self)) if allowed is None else allowed
+        return sorted(self._distances(lat, lng, idx))
+
+    def _candidates(self, center, r, allowed: Optional[Set[int]]) -> List[int]:
+        out: List[int] = []
+        for cell in self._ring(center, r):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                out.extend(i for i in bucket if allowed is None or i in allowed)
+        return out
+
+    # ---- queries ----
+    def within(
+        self, lat: float, lng: float, radius_km: float, allowed: Optional[Set[int]] = None
+    ) -> List[Tuple[float, int]]:
+        """(distance_km, index) for every point within radius_km, nearest first."""
+        center = self._cell(lat, lng)
+        found: List[Tuple[float, int]] = []
+        r = 0
+        while True:
+            if self._ring_is_sparse(r):
+                return [hit for hit in self._scan_all(lat, lng, allowed) if hit[0] <= radius_km]
+            found.extend(
+                hit for hit in self._distances(lat, lng, self._candidates(center, r, allowed))
+                if hit[0] <= radius_km
+            )
+            if self._ring_clearance_km(lat, r) > radius_km:
+                break
+            r += 1
+        found.sort()
+        return found
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        radius_km: Optional[float] = None,
+        allowed: Optional[Set[int]] = None,
+    ) -> List[Tuple[float, int]]:
+        """The k closest points (optionally capped at radius_km), nearest first."""
+        center = self._cell(lat, lng)
+        found: List[Tuple[float, int]] = []
+        r = 0
+        while True:
+            if self._ring_is_sparse(r):
+                found = self._scan_all(lat, lng, allowed)
+                break
+            found.extend(self._distances(lat, lng, self._candidates(center, r, allowed)))
+            clearance = self._ring_clearance_km(lat, r)
+            if radius_km is not None and clearance > radius_km:
+                break
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= clearance:
+                    break
+            r += 1
+        found.sort()
+        if radius_km is not None:
+            found = [hit for hit in found if hit[0] <= radius_km]
+        return found[:k]
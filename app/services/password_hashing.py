@@ -0,0 +1,121 @@
+# app/services/password_hashing.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+from app.services.auth import get_password_hash, verify_password
+
+# bcrypt at our cost factor takes ~250 ms; buckets centred on that
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hash/verify on a dedicated, size-capped executor.
+
+    Keeps login/signup bursts from occupying Starlette's shared threadpool
+    (which also serves every sync endpoint). At most `max_pending` calls may
+    be queued or running; beyond that callers get a 503 instead of piling up.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_pending: int = 64):
+        self.kind = kind
+        self.workers = max(int(workers), 1)
+        self.max_pending = max(int(max_pending), self.workers)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time = Histogram(_LATENCY_BUCKETS)
+        self.latency = Histogram(_LATENCY_BUCKETS)
+
+    def _get_executor(self) -> Executor:
+        # created lazily so importing this module (e.g. from scripts) spawns nothing
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="pwhash"
+                        )
+        return self._executor
+
+    async def _run(self, fn, *args) -> Any:
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-in attempts in progress, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            if self.kind == "process":
+                # queue wait is not observable inside another process
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+            return await loop.run_in_executor(self._get_executor(), self._timed, submitted, fn, *args)
+        finally:
+            self.latency.observe(time.perf_counter() - submitted)
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+
+    def _timed(self, submitted: float, fn, *args) -> Any:
+        self.wait_time.observe(time.perf_counter() - submitted)
+        return fn(*args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": in_flight,
+            "queue_depth": max(in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds": self.wait_time.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def check_password(plain: str, hashed: str) -> bool:
+    return await password_hasher.verify(plain, hashed)
@@ -0,0 +1,204 @@
+# app/services/port_bundles.py
+"""
+Offline port-guide bundles: one gzip'd JSON file per port with every pub,
+restaurant and hotel within the port's radius, plus a prebuilt search index
+and spatial grid so the app can search and "near me" offline.
+
+Ports come from PORTS_FILE (name, lat, lng, radius_km). Bundles are written
+to BUNDLE_DIR with a manifest.json. Output is byte-for-byte deterministic
+(sorted keys, gzip mtime 0), so the strong ETag only changes when content
+does.
+
+Rebuilds are incremental. When a catalog version moves, each port's input
+rows are re-hashed, and only ports whose rows changed are re-indexed,
+recompressed and rewritten. Rebuilds run from build_port_bundles.py or
+lazily on the first request after a catalog change.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.migrations import PROJECT_ROOT
+from app.services.catalog_cache import snapshot_all
+from app.services.geo import GeoGrid
+from app.services.search import CATALOGS, InvertedIndex
+
+BUNDLE_FORMAT = 1
+MANIFEST = "manifest.json"
+
+# catalog table -> indexed fields/weights (same as the online search)
+_SEARCH_FIELDS = {c.cache.name: c.fields for c in CATALOGS.values()}
+
+
+@dataclass(frozen=True)
+class Port:
+    name: str
+    slug: str
+    lat: float
+    lng: float
+    radius_km: float
+
+
+@dataclass(frozen=True)
+class Bundle:
+    port: str
+    etag: str
+    size: int
+    input_hash: str
+    file: str
+    rows: int
+
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def _resolve(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def load_ports(path: Optional[str] = None) -> List[Port]:
+    with open(_resolve(path or settings.PORTS_FILE)) as f:
+        return [
+            Port(name=p["name"], slug=slugify(p["name"]), lat=p["lat"], lng=p["lng"], radius_km=p["radius_km"])
+            for p in json.load(f)
+        ]
+
+
+def _dumps(obj) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _port_rows(port: Port, snapshots) -> Dict[str, List[dict]]:
+    out = {}
+    for name, snap in sorted(snapshots.items()):
+        hits = snap.geo.within(port.lat, port.lng, port.radius_km)
+        out[name] = sorted((snap.rows[i] for _, i in hits), key=lambda r: r["id"])
+    return out
+
+
+def _search_index(rows: List[dict], fields: Dict[str, float]) -> dict:
+    index = InvertedIndex(rows, fields)
+    return {
+        "fields": fields,
+        "lengths": index.lengths,
+        "postings": {term: sorted(docs.items()) for term, docs in index.postings.items()},
+    }
+
+
+def _spatial_index(rows: List[dict]) -> dict:
+    grid = GeoGrid([r["lat"] for r in rows], [r["lng"] for r in rows])
+    return {
+        "cell_deg": grid.cell_deg,
+        "cells": {f"{i}:{j}": idx for (i, j), idx in sorted(grid.cells().items())},
+    }
+
+
+def build_bundle(port: Port, catalogs: Dict[str, List[dict]]) -> bytes:
+    payload = {
+        "format": BUNDLE_FORMAT,
+        "port": asdict(port),
+        "catalogs": catalogs,
+        "search": {name: _search_index(rows, _SEARCH_FIELDS[name]) for name, rows in catalogs.items()},
+        "spatial": {name: _spatial_index(rows) for name, rows in catalogs.items()},
+    }
+    return gzip.compress(_dumps(payload), compresslevel=9, mtime=0)
+
+
+def _catalog_versions(snapshots) -> Dict[str, int]:
+    return {name: snap.version for name, snap in snapshots.items()}
+
+
+class BundleStore:
+    def __init__(self, directory: Optional[str] = None, ports_file: Optional[str] = None):
+        self.directory = _resolve(directory or settings.BUNDLE_DIR)
+        self.ports_file = ports_file
+        self._lock = threading.Lock()
+        self._versions: Optional[Dict[str, int]] = None
+        self._bundles: Dict[str, Bundle] = {}
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # bundles in an older layout are rebuilt from scratch
+        return manifest.get("bundles", {}) if manifest.get("format") == BUNDLE_FORMAT else {}
+
+    def rebuild(self, db: Session, force: bool = False) -> List[Tuple[Bundle, bool]]:
+        """Bring every port's bundle up to date. -> [(bundle, rebuilt?)]"""
+        with self._lock:
+            return self._rebuild(snapshot_all(db), force)
+
+    def _rebuild(self, snapshots, force: bool = False) -> List[Tuple[Bundle, bool]]:
+        # caller holds self._lock
+        os.makedirs(self.directory, exist_ok=True)
+        previous = {} if force else self._read_manifest()
+        results: List[Tuple[Bundle, bool]] = []
+        for port in load_ports(self.ports_file):
+            catalogs = _port_rows(port, snapshots)
+            input_hash = hashlib.sha256(_dumps([asdict(port), catalogs])).hexdigest()
+            prev = previous.get(port.slug)
+            path = os.path.join(self.directory, f"{port.slug}.json.gz")
+            if prev and prev["input_hash"] == input_hash and os.path.exists(path):
+                results.append((Bundle(**prev), False))
+                continue
+            data = build_bundle(port, catalogs)
+            _write_atomic(path, data)
+            bundle = Bundle(
+                port=port.name,
+                etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+                size=len(data),
+                input_hash=input_hash,
+                file=os.path.basename(path),
+                rows=sum(len(rows) for rows in catalogs.values()),
+            )
+            results.append((bundle, True))
+
+        versions = _catalog_versions(snapshots)
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "catalog_versions": versions,
+            "bundles": {slugify(b.port): asdict(b) for b, _ in results},
+        }
+        _write_atomic(os.path.join(self.directory, MANIFEST), _dumps(manifest))
+        self._bundles = {slugify(b.port): b for b, _ in results}
+        self._versions = versions
+        return results
+
+    def ensure_current(self, db: Session) -> Dict[str, Bundle]:
+        """Bundles for the current catalog versions, rebuilding changed ports if needed."""
+        if _catalog_versions(snapshot_all(db)) != self._versions:
+            with self._lock:
+                # whoever held the lock may have rebuilt already; re-read so a
+                # waiter never rebuilds from an older snapshot either
+                snapshots = snapshot_all(db)
+                if _catalog_versions(snapshots) != self._versions:
+                    self._rebuild(snapshots)
+        return self._bundles
+
+    def read(self, bundle: Bundle) -> bytes:
+        with open(os.path.join(self.directory, bundle.file), "rb") as f:
+            return f.read()
+
+
+bundle_store = BundleStore()
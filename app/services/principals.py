@@ -0,0 +1,140 @@
+# app/services/principals.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Detached, read-only snapshot of the authenticated user.
+
+    Safe to share between requests (unlike an ORM `User` bound to one session).
+    Carries only column values; load relationships explicitly when needed.
+    """
+    id: int
+    email: str
+    role: str
+    name: Optional[str] = None
+    mobile_number: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            name=user.name,
+            mobile_number=user.mobile_number,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            token_version=user.token_version or 0,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "Principal":
+        """Build a principal purely from verified token claims (no profile fields)."""
+        return cls(
+            id=int(payload["uid"]),
+            email=payload["sub"],
+            role=payload["role"],
+            token_version=int(payload["ver"]),
+        )
+
+
+# email -> Principal
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+# user id -> token_version; the revocation check for claims-only tokens
+token_version_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+async def load_principal(db: AsyncSession, email: str) -> Optional[Principal]:
+    """Return the principal for `email`, hitting the users table only on a cache miss."""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = await db.scalar(select(User).where(User.email == email))
+    if not user:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(email, principal)
+    return principal
+
+
+async def load_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    """Current token_version for `user_id` (None if the user no longer exists)."""
+    version = token_version_cache.get(user_id)
+    if version is not None:
+        return version
+
+    version = await db.scalar(select(User.token_version).where(User.id == user_id))
+    if version is None:
+        return None
+    token_version_cache.set(user_id, version)
+    return version
+
+
+async def is_token_current(db: AsyncSession, payload: dict) -> bool:
+    """
+    Revocation check for tokens carrying a `ver` claim.
+
+    Tokens without `ver` (issued before claims mode) cannot be revoked by
+    version and are accepted as before.
+    """
+    if payload.get("ver") is None or payload.get("uid") is None:
+        return True
+    current = await load_token_version(db, int(payload["uid"]))
+    return current is not None and current == int(payload["ver"])
+
+
+def invalidate_principal(email: Optional[str]) -> None:
+    if email:
+        principal_cache.pop(email)
+
+
+# ---- Revocation ----
+# Changing who the user is, what they may do, or their password revokes every
+# token issued so far.
+_REVOKING_ATTRS = ("email", "role", "hashed_password")
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _REVOKING_ATTRS):
+        if not state.attrs.token_version.history.has_changes():
+            target.token_version = (target.token_version or 0) + 1
+
+
+# ---- Invalidation ----
+# Drop cached principals as soon as this process flushes a change to the user
+# row. Other workers converge within AUTH_CACHE_TTL_SECONDS.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    invalidate_principal(target.email)
+    token_version_cache.pop(target.id)
+    # email itself may have changed: also evict the old key
+    for old_email in inspect(target).attrs.email.history.deleted:
+        invalidate_principal(old_email)
@@ -0,0 +1,414 @@
+# app/services/routing.py
+"""
+Offline road distances for cab estimates (no network calls).
+
+The road network is a file-based extract at ROAD_GRAPH_PATH, produced by
+build_road_graph.py from an OpenStreetMap .osm export. It is loaded once
+per process into CSR arrays: `offsets[u]:offsets[u+1]` slices `targets`,
+`time_s` and `length_m` for the edges leaving node u.
+
+The builder also contracts the graph (contraction hierarchies, `contract()`
+below): nodes get a rank, and shortcut edges stand in for the paths
+through lower-ranked nodes. A query is then two small Dijkstra searches
+that only climb in rank, one forward from the pickup and one backward from
+the drop, meeting at the top. Shortcuts carry their summed length, so no
+path unpacking is needed for a distance. Graphs built with --no-ch are
+searched with plain A* on the base edges instead.
+
+Both endpoints are snapped to the nearest road node (a fine GeoGrid over
+the nodes), and results are cached per snapped node pair, so nearby
+pickups (same gate, same hotel) share one search. Without a graph file,
+when a point is more than ROUTING_SNAP_MAX_KM from any road, or when no
+path exists, the distance falls back to great-circle x ROAD_DETOUR_FACTOR
+and the route is flagged `exact=False`.
+"""
+from __future__ import annotations
+
+import gzip
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.db.migrations import PROJECT_ROOT
+from app.services.geo import GeoGrid, haversine_km
+
+logger = logging.getLogger("app.routing")
+
+GRAPH_FORMAT = 1
+SNAP_CELL_DEG = 0.005  # ~550 m; road nodes are dense, keep candidate sets small
+
+Adjacency = List[Dict[int, Tuple[float, float]]]  # u -> {v: (time_s, length_m)}
+
+
+@dataclass(frozen=True)
+class Route:
+    distance_km: float
+    duration_min: float
+    exact: bool  # False: no road path, great-circle estimate
+
+
+class Csr:
+    """Compressed adjacency: the edges of u are offsets[u]:offsets[u+1]."""
+
+    def __init__(self, offsets, targets, time_s, length_m):
+        self.offsets = array("l", offsets)
+        self.targets = array("l", targets)
+        self.time_s = array("d", time_s)
+        self.length_m = array("d", length_m)
+
+    @classmethod
+    def from_adjacency(cls, adj: Adjacency) -> "Csr":
+        offsets, targets, time_s, length_m = [0], [], [], []
+        for edges in adj:
+            for v, (t, l) in sorted(edges.items()):
+                targets.append(v)
+                time_s.append(round(t, 2))
+                length_m.append(round(l, 1))
+            offsets.append(len(targets))
+        return cls(offsets, targets, time_s, length_m)
+
+    def to_dict(self) -> dict:
+        return {
+            "offsets": list(self.offsets),
+            "targets": list(self.targets),
+            "time_s": list(self.time_s),
+            "length_m": list(self.length_m),
+        }
+
+
+# ---- preprocessing (build_road_graph.py) ----
+def _witness(out: Adjacency, contracted, src: int, skip: int, max_cost: float, max_settled: int) -> Dict[int, float]:
+    """Bounded Dijkstra from src over uncontracted nodes, avoiding `skip`."""
+    dist = {src: 0.0}
+    heap = [(0.0, src)]
+    settled = 0
+    while heap and settled < max_settled:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        if d > max_cost:
+            break
+        settled += 1
+        for v, (t, _) in out[u].items():
+            if v == skip or contracted[v]:
+                continue
+            nd = d + t
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def contract(n: int, edges: Iterable[Tuple[int, int, float, float]], max_settled: int = 200) -> Tuple[Csr, Csr]:
+    """
+    Contraction hierarchies over directed edges (u, v, time_s, length_m).
+    -> (up, down): `up` holds each node's edges to higher-ranked nodes, for
+    the forward search; `down` holds, reversed, the edges arriving at each
+    node from higher-ranked nodes, for the backward search.
+    """
+    out: Adjacency = [{} for _ in range(n)]
+    inn: Adjacency = [{} for _ in range(n)]
+
+    def add(u, v, t, l):
+        if u != v and (v not in out[u] or t < out[u][v][0]):
+            out[u][v] = inn[v][u] = (t, l)
+
+    for u, v, t, l in edges:
+        add(u, v, t, l)
+
+    contracted = [False] * n
+    deleted = [0] * n  # contracted neighbours: spreads contraction evenly
+
+    def shortcuts(v):
+        ins = [(u, c) for u, c in inn[v].items() if not contracted[u]]
+        outs = [(w, c) for w, c in out[v].items() if not contracted[w]]
+        found = []
+        for u, (tu, lu) in ins:
+            targets = [(w, c) for w, c in outs if w != u]
+            if not targets:
+                continue
+            limit = tu + max(c[0] for _, c in targets)
+            dist = _witness(out, contracted, u, v, limit, max_settled)
+            for w, (tw, lw) in targets:
+                if dist.get(w, math.inf) > tu + tw:
+                    found.append((u, w, tu + tw, lu + lw))
+        return found, len(ins) + len(outs)
+
+    def priority(v):
+        found, degree = shortcuts(v)
+        return len(found) - degree + deleted[v]
+
+    heap = [(priority(v), v) for v in range(n)]
+    heapq.heapify(heap)
+    rank = [0] * n
+    order = 0
+    while heap:
+        _, v = heapq.heappop(heap)
+        if contracted[v]:
+            continue
+        # lazy update: re-queue if the node got worse than the next candidate
+        p = priority(v)
+        if heap and p > heap[0][0]:
+            heapq.heappush(heap, (p, v))
+            continue
+        for u, w, t, l in shortcuts(v)[0]:
+            add(u, w, t, l)
+        contracted[v] = True
+        rank[v] = order
+        order += 1
+        for x in list(inn[v]) + list(out[v]):
+            deleted[x] += 1
+
+    up: Adjacency = [{} for _ in range(n)]
+    down: Adjacency = [{} for _ in range(n)]
+    for u in range(n):
+        for v, c in out[u].items():
+            if rank[v] > rank[u]:
+                up[u][v] = c
+            else:
+                down[v][u] = c
+    return Csr.from_adjacency(up), Csr.from_adjacency(down)
+
+
+def _upward(g: Csr, src: int) -> Tuple[Dict[int, float], Dict[int, float]]:
+    """Whole upward search space of src. -> (node -> time_s, node -> length_m)"""
+    offsets, targets, time_s, length_m = g.offsets, g.targets, g.time_s, g.length_m
+    best = {src: 0.0}
+    meters = {src: 0.0}
+    heap = [(0.0, src)]
+    pop, push = heapq.heappop, heapq.heappush
+    while heap:
+        d, u = pop(heap)
+        if d > best[u]:
+            continue
+        mu = meters[u]
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            nd = d + time_s[e]
+            if nd < best.get(v, math.inf):
+                best[v] = nd
+                meters[v] = mu + length_m[e]
+                push(heap, (nd, v))
+    return best, meters
+
+
+# ---- queries ----
+class RoadGraph:
+    def __init__(self, lat, lng, base: Csr, up: Optional[Csr] = None, down: Optional[Csr] = None):
+        self.lat = array("d", lat)
+        self.lng = array("d", lng)
+        self.base = base
+        self.up = up
+        self.down = down
+        if len(base.offsets) != len(self.lat) + 1:
+            raise ValueError("road graph offsets do not match node count")
+        # fastest edge speed bounds the A* heuristic, keeping it exact
+        self.max_speed_mps = max(
+            (l / t for l, t in zip(base.length_m, base.time_s) if t > 0), default=1.0
+        )
+        self.grid = GeoGrid(self.lat, self.lng, cell_deg=SNAP_CELL_DEG)
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        with gzip.open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        if data.get("format") != GRAPH_FORMAT:
+            raise ValueError(f"unsupported road graph format: {data.get('format')!r}")
+        ch = data.get("ch")
+        return cls(
+            data["lat"],
+            data["lng"],
+            Csr(**data["base"]),
+            Csr(**ch["up"]) if ch else None,
+            Csr(**ch["down"]) if ch else None,
+        )
+
+    def to_dict(self) -> dict:
+        data = {
+            "format": GRAPH_FORMAT,
+            "lat": list(self.lat),
+            "lng": list(self.lng),
+            "base": self.base.to_dict(),
+        }
+        if self.up is not None:
+            data["ch"] = {"up": self.up.to_dict(), "down": self.down.to_dict()}
+        return data
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def snap(self, lat: float, lng: float, max_km: float) -> Optional[Tuple[float, int]]:
+        """(distance_km, node) of the closest road node within max_km."""
+        hits = self.grid.nearest(lat, lng, 1, radius_km=max_km)
+        return hits[0] if hits else None
+
+    def shortest(self, src: int, dst: int) -> Optional[Tuple[float, float]]:
+        """Fastest path. -> (length_m, time_s), or None when dst is unreachable."""
+        if src == dst:
+            return 0.0, 0.0
+        if self.up is not None:
+            return self._ch_query(src, dst)
+        return self._astar(src, dst)
+
+    def _ch_query(self, src: int, dst: int) -> Optional[Tuple[float, float]]:
+        # upward search spaces are a few hundred nodes, so both run to completion
+        fwd, fwd_m = _upward(self.up, src)
+        bwd, bwd_m = _upward(self.down, dst)
+        if len(bwd) < len(fwd):
+            fwd, bwd, fwd_m, bwd_m = bwd, fwd, bwd_m, fwd_m
+        best, meet = math.inf, None
+        for node, t in fwd.items():
+            other = bwd.get(node)
+            if other is not None and t + other < best:
+                best, meet = t + other, node
+        if meet is None:
+            return None
+        return fwd_m[meet] + bwd_m[meet], best
+
+    def _astar(self, src: int, dst: int) -> Optional[Tuple[float, float]]:
+        lat, lng = self.lat, self.lng
+        offsets, targets = self.base.offsets, self.base.targets
+        time_s, length_m = self.base.time_s, self.base.length_m
+        dlat, dlng = lat[dst], lng[dst]
+        inv_speed = 1.0 / self.max_speed_mps
+
+        def h(n: int) -> float:
+            return haversine_km(lat[n], lng[n], dlat, dlng) * 1000.0 * inv_speed
+
+        best = {src: 0.0}
+        meters = {src: 0.0}
+        done = set()
+        heap = [(h(src), 0.0, src)]
+        push, pop = heapq.heappush, heapq.heappop
+        while heap:
+            _, g, u = pop(heap)
+            if u == dst:
+                return meters[u], g
+            if u in done:
+                continue
+            done.add(u)
+            mu = meters[u]
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                ng = g + time_s[e]
+                if ng < best.get(v, math.inf):
+                    best[v] = ng
+                    meters[v] = mu + length_m[e]
+                    push(heap, (ng + h(v), ng, v))
+        return None
+
+
+class RoadRouter:
+    """Lazily loads the graph; thread-safe LRU of node-pair results."""
+
+    def __init__(self, path: Optional[str] = None, cache_size: Optional[int] = None):
+        self.path = path
+        self.cache_size = cache_size
+        self._graph: Optional[RoadGraph] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[int, int], Optional[Tuple[float, float]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.search_seconds = 0.0
+
+    def _resolve(self) -> str:
+        path = self.path or settings.ROAD_GRAPH_PATH
+        return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+    def graph(self) -> Optional[RoadGraph]:
+        if self._loaded:
+            return self._graph
+        with self._load_lock:
+            if not self._loaded:
+                path = self._resolve()
+                try:
+                    started = time.perf_counter()
+                    self._graph = RoadGraph.load(path)
+                    logger.info(
+                        "road graph loaded: %d nodes, %d edges in %.0f ms",
+                        len(self._graph), len(self._graph.base.targets), (time.perf_counter() - started) * 1000,
+                    )
+                except (OSError, ValueError) as exc:
+                    logger.warning("road graph unavailable (%s); using great-circle estimates", exc)
+                self._loaded = True
+        return self._graph
+
+    def _pair(self, graph: RoadGraph, src: int, dst: int) -> Optional[Tuple[float, float]]:
+        key = (src, dst)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+        started = time.perf_counter()
+        result = graph.shortest(src, dst)
+        elapsed = time.perf_counter() - started
+        with self._cache_lock:
+            self.misses += 1
+            self.search_seconds += elapsed
+            self._cache[key] = result
+            limit = self.cache_size or settings.ROUTE_CACHE_MAX_ENTRIES
+            while len(self._cache) > limit:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _estimate(lat1: float, lng1: float, lat2: float, lng2: float) -> Route:
+        km = haversine_km(lat1, lng1, lat2, lng2) * settings.ROAD_DETOUR_FACTOR
+        return Route(km, km / settings.ROUTING_FALLBACK_SPEED_KMH * 60.0, exact=False)
+
+    def route(self, lat1: float, lng1: float, lat2: float, lng2: float) -> Route:
+        graph = self.graph()
+        if graph is not None:
+            a = graph.snap(lat1, lng1, settings.ROUTING_SNAP_MAX_KM)
+            b = graph.snap(lat2, lng2, settings.ROUTING_SNAP_MAX_KM)
+            if a and b:
+                found = self._pair(graph, a[1], b[1])
+                if found is not None:
+                    # point -> road node legs are counted at the fallback speed
+                    access_km = a[0] + b[0]
+                    km = found[0] / 1000.0 + access_km
+                    minutes = found[1] / 60.0 + access_km / settings.ROUTING_FALLBACK_SPEED_KMH * 60.0
+                    return Route(km, minutes, exact=True)
+        self.fallbacks += 1
+        return self._estimate(lat1, lng1, lat2, lng2)
+
+    def route_many(self, pairs: Sequence[Tuple[float, float, float, float]]) -> List[Route]:
+        """route() for each (lat1, lng1, lat2, lng2); repeated pairs are computed once."""
+        seen: Dict[Tuple[float, float, float, float], Route] = {}
+        out = []
+        for pair in pairs:
+            route = seen.get(pair)
+            if route is None:
+                route = seen[pair] = self.route(*pair)
+            out.append(route)
+        return out
+
+    def stats(self) -> dict:
+        graph = self._graph
+        return {
+            "nodes": len(graph) if graph else 0,
+            "edges": len(graph.base.targets) if graph else 0,
+            "contracted": graph is not None and graph.up is not None,
+            "cache_entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+            "avg_search_ms": round(self.search_seconds / self.misses * 1000, 3) if self.misses else None,
+        }
+
+
+road_router = RoadRouter()
@@ -0,0 +1,248 @@
+# app/services/scheduler.py
+"""
+Scheduled cab bookings: promote them to dispatch at their lead time.
+
+A booking whose scheduled_time is more than DISPATCH_LEAD_SECONDS away is
+stored as SCHEDULED, so the dispatcher's pending scan never sees it. One
+worker (the leader) keeps every SCHEDULED booking in a heap keyed by its
+dispatch time and, when that time comes, flips it to PENDING in a batch
+UPDATE conditional on it still being SCHEDULED (a cancelled booking stays
+cancelled). The dispatcher picks it up on its next round.
+
+Leadership: each worker holds one dedicated connection and tries a
+session-level Postgres advisory lock on it every
+SCHEDULER_LEADER_RETRY_SECONDS. The winner keeps the lock for the life of
+that connection; if the worker exits or the connection drops, Postgres
+releases it and another worker takes over.
+
+No polling: the leader reloads the heap from cab_bookings when it gains
+leadership (and every SCHEDULER_RESYNC_SECONDS as a safety net), then
+sleeps in select() on its connection until the next dispatch time.
+/crew/cab/book sends NOTIFY on SCHEDULE_CHANNEL in the booking's own
+transaction, which wakes the leader to add the new entry.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import select as selectors
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.db.models.cab_booking import BookingStatus, CabBooking
+
+logger = logging.getLogger("app.scheduler")
+
+SCHEDULE_CHANNEL = "cab_scheduled"
+LEADER_LOCK_KEY = 0x43414253  # pg_advisory_lock id for the booking scheduler ("CABS")
+
+
+def dispatch_at(scheduled_time: datetime) -> float:
+    """Epoch seconds at which a booking scheduled for `scheduled_time` (naive = UTC) becomes pending."""
+    if scheduled_time.tzinfo is None:
+        scheduled_time = scheduled_time.replace(tzinfo=timezone.utc)
+    return scheduled_time.timestamp() - settings.DISPATCH_LEAD_SECONDS
+
+
+def initial_status(scheduled_time: Optional[datetime]) -> BookingStatus:
+    if scheduled_time is not None and dispatch_at(scheduled_time) > time.time():
+        return BookingStatus.SCHEDULED
+    return BookingStatus.PENDING
+
+
+def schedule_notification(booking_id: int, scheduled_time: datetime):
+    """NOTIFY for the leader; execute it in the booking's transaction (sent on commit)."""
+    return select(func.pg_notify(SCHEDULE_CHANNEL, f"{booking_id}:{dispatch_at(scheduled_time)}"))
+
+
+class ScheduleHeap:
+    """
+    Booking ids by dispatch time, earliest first. Re-pushing an id moves it;
+    the old heap entry is skipped lazily. Owned by the scheduler thread.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int]] = []
+        self._due: Dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._due.clear()
+
+    def push(self, booking_id: int, due: float) -> None:
+        if self._due.get(booking_id) == due:
+            return
+        self._due[booking_id] = due
+        heapq.heappush(self._heap, (due, booking_id))
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(d, i) for i, d in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def _skim(self) -> None:
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[float]:
+        self._skim()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int) -> List[int]:
+        out = []
+        while len(out) < limit:
+            self._skim()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, booking_id = heapq.heappop(self._heap)
+            del self._due[booking_id]
+            out.append(booking_id)
+        return out
+
+
+class BookingScheduler:
+    """Leader election, heap upkeep and promotion, on one background thread."""
+
+    def __init__(self):
+        self.engine: Optional[Engine] = None
+        self.session_factory = None
+        self.heap = ScheduleHeap()
+        self.is_leader = False
+        self.next_due: Optional[float] = None  # published by the thread for stats()
+        self.promoted = 0
+        self.notifications = 0
+        self.reloads = 0
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, engine: Engine, session_factory) -> None:
+        if self._thread is None:
+            self.engine = engine
+            self.session_factory = session_factory
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="booking-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        os.write(self._wake_w, b"x")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ---- database ----
+    def _reload(self) -> None:
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(CabBooking.id, CabBooking.scheduled_time)
+                .where(CabBooking.status == BookingStatus.SCHEDULED)
+            ).all()
+        self.heap.clear()
+        for booking_id, scheduled_time in rows:
+            # a SCHEDULED row without a time cannot wait for anything: due now
+            self.heap.push(booking_id, dispatch_at(scheduled_time) if scheduled_time else 0.0)
+        self.reloads += 1
+
+    def _promote_due(self, now: float) -> None:
+        while True:
+            ids = self.heap.pop_due(now, settings.SCHEDULER_PROMOTE_BATCH)
+            if not ids:
+                return
+            with self.session_factory() as db:
+                result = db.execute(
+                    update(CabBooking)
+                    .where(CabBooking.id.in_(ids), CabBooking.status == BookingStatus.SCHEDULED)
+                    .values(status=BookingStatus.PENDING, updated_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            self.promoted += result.rowcount
+
+    # ---- thread ----
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._serve()
+            except Exception:
+                logger.exception("booking scheduler failed; retrying")
+            finally:
+                self.is_leader = False
+                self.next_due = None
+                self.heap.clear()
+            self._stop.wait(settings.SCHEDULER_LEADER_RETRY_SECONDS)
+
+    def _serve(self) -> None:
+        # a connection of our own, outside the pool: it holds the lock and LISTENs
+        fairy = self.engine.raw_connection()
+        fairy.detach()
+        try:
+            conn = fairy.driver_connection
+            conn.autocommit = True
+            cur = conn.cursor()
+            while True:
+                cur.execute("SELECT pg_try_advisory_lock(%s)", (LEADER_LOCK_KEY,))
+                if cur.fetchone()[0]:
+                    break
+                if self._stop.wait(settings.SCHEDULER_LEADER_RETRY_SECONDS):
+                    return
+            self.is_leader = True
+            logger.info("booking scheduler: leader")
+            # LISTEN before the load, so nothing booked in between is missed
+            cur.execute(f"LISTEN {SCHEDULE_CHANNEL}")
+            self._reload()
+            resync_at = time.time() + settings.SCHEDULER_RESYNC_SECONDS
+
+            while not self._stop.is_set():
+                now = time.time()
+                if now >= resync_at:
+                    self._reload()
+                    resync_at = now + settings.SCHEDULER_RESYNC_SECONDS
+                self._promote_due(now)
+
+                wake_at = resync_at
+                self.next_due = next_due = self.heap.next_due()
+                if next_due is not None:
+                    wake_at = min(wake_at, next_due)
+                ready, _, _ = selectors.select([conn, self._wake_r], [], [], max(0.0, wake_at - time.time()))
+                if self._wake_r in ready:
+                    os.read(self._wake_r, 64)
+                if conn in ready:
+                    conn.poll()
+                    for note in conn.notifies:
+                        self._on_notify(note.payload)
+                    conn.notifies.clear()
+        finally:
+            fairy.close()  # closing the session releases the advisory lock
+
+    def _on_notify(self, payload: str) -> None:
+        try:
+            booking_id, due = payload.split(":")
+            self.heap.push(int(booking_id), float(due))
+        except ValueError:
+            logger.warning("booking scheduler: bad notification %r", payload)
+            return
+        self.notifications += 1
+
+    def stats(self) -> dict:
+        next_due = self.next_due
+        return {
+            "leader": self.is_leader,
+            "scheduled": len(self.heap),
+            "next_due_in_s": round(next_due - time.time(), 1) if next_due is not None else None,
+            "promoted": self.promoted,
+            "notifications": self.notifications,
+            "reloads": self.reloads,
+        }
+
+
+booking_scheduler = BookingScheduler()
@@ -0,0 +1,208 @@
+# app/services/search.py
+"""
+In-process full-text search over the cached catalogs.
+
+One inverted index per catalog, rebuilt whenever the catalog cache loads a
+new snapshot. Each query token matches indexed terms three ways:
+
+- exactly,
+- as a prefix ("biry" -> "biryani"), and
+- within one edit ("biryani" -> "biriyani"), using a deletion-neighbourhood
+  map so no per-term edit-distance scan is needed.
+
+Scoring is BM25 over weighted fields (name > cuisine/tags > description).
+Prefix and typo matches count for less than exact ones. Documents that
+match more of the query tokens always rank first.
+"""
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.catalog_cache import CatalogCache, hotels_cache, pubs_cache, restaurants_cache
+
+# field -> weight
+PUB_FIELDS = {"name": 3.0, "service_type": 2.0, "popular_for": 2.0, "location_name": 1.0, "description": 1.0}
+RESTAURANT_FIELDS = {
+    "name": 3.0, "service_type": 2.0, "popular_for": 2.0,
+    "location_name": 1.0, "address": 1.0, "description": 1.0,
+}
+HOTEL_FIELDS = {"name": 3.0, "location": 1.0}
+
+EXACT, PREFIX, TYPO = 1.0, 0.7, 0.5
+MIN_PREFIX_LEN = 2
+MIN_TYPO_LEN = 4
+MAX_EXPANSIONS = 50
+BM25_K1, BM25_B = 1.2, 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return _WORD.findall(text)
+
+
+def _field_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def _deletes(term: str) -> Iterable[str]:
+    for i in range(len(term)):
+        yield term[:i] + term[i + 1:]
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Levenshtein distance <= 1, plus adjacent transpositions."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        return len(diff) == 1 or (
+            len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+        )
+    if la > lb:
+        a, b = b, a
+    # b is one longer: dropping one char from b must give a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class InvertedIndex:
+    def __init__(self, docs: Sequence[dict], fields: Dict[str, float]):
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        lengths: List[float] = []
+        for doc_id, doc in enumerate(docs):
+            length = 0.0
+            for fname, weight in fields.items():
+                for term in tokenize(_field_text(doc.get(fname))):
+                    postings[term][doc_id] = postings[term].get(doc_id, 0.0) + weight
+                    length += weight
+            lengths.append(length)
+
+        self.n_docs = len(docs)
+        self.postings = dict(postings)
+        self.lengths = lengths
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self.terms = sorted(self.postings)
+        self.idf = {
+            t: math.log(1 + (self.n_docs - len(p) + 0.5) / (len(p) + 0.5))
+            for t, p in self.postings.items()
+        }
+        self._deletes: Dict[str, List[str]] = defaultdict(list)
+        for term in self.terms:
+            if len(term) >= MIN_TYPO_LEN:
+                for d in _deletes(term):
+                    self._deletes[d].append(term)
+
+    # ---- term expansion ----
+    def expand(self, token: str) -> Dict[str, float]:
+        """Indexed terms matching `token`, with the match-quality multiplier for each."""
+        out: Dict[str, float] = {}
+        if token in self.postings:
+            out[token] = EXACT
+
+        if len(token) >= MIN_PREFIX_LEN:
+            i = bisect_left(self.terms, token)
+            while i < len(self.terms) and self.terms[i].startswith(token) and len(out) < MAX_EXPANSIONS:
+                out.setdefault(self.terms[i], PREFIX)
+                i += 1
+
+        if len(token) >= MIN_TYPO_LEN:
+            candidates = set(self._deletes.get(token, ()))  # query is missing one char
+            for d in _deletes(token):
+                if d in self.postings:
+                    candidates.add(d)  # query has one extra char
+                candidates.update(self._deletes.get(d, ()))  # substitution / transposition
+            for term in candidates:
+                if term not in out and _within_one_edit(token, term):
+                    out[term] = TYPO
+                    if len(out) >= MAX_EXPANSIONS:
+                        break
+        return out
+
+    # ---- ranking ----
+    def search(self, query: str) -> List[Tuple[int, float, int]]:
+        """(tokens matched, score, doc_id) best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.n_docs:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, int] = defaultdict(int)
+        for token in tokens:
+            best: Dict[int, float] = {}
+            for term, quality in self.expand(token).items():
+                idf = self.idf[term]
+                for doc_id, tf in self.postings[term].items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / self.avg_length)
+                    s = quality * idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    if s > best.get(doc_id, 0.0):
+                        best[doc_id] = s
+            for doc_id, s in best.items():
+                scores[doc_id] += s
+                matched[doc_id] += 1
+
+        ranked = sorted(scores, key=lambda d: (-matched[d], -scores[d], d))
+        return [(matched[d], scores[d], d) for d in ranked]
+
+
+@dataclass(frozen=True)
+class _Catalog:
+    kind: str
+    cache: CatalogCache
+    fields: Dict[str, float]
+
+
+CATALOGS = {
+    "pub": _Catalog("pub", pubs_cache, PUB_FIELDS),
+    "restaurant": _Catalog("restaurant", restaurants_cache, RESTAURANT_FIELDS),
+    "hotel": _Catalog("hotel", hotels_cache, HOTEL_FIELDS),
+}
+
+# kind -> (snapshot the index was built from, index)
+_indexes: Dict[str, Tuple[object, InvertedIndex]] = {}
+
+
+def _index_for(catalog: _Catalog, db: Session):
+    snap = catalog.cache.snapshot(db)
+    built = _indexes.get(catalog.kind)
+    if built is None or built[0] is not snap:
+        built = (snap, InvertedIndex(snap.rows, catalog.fields))
+        _indexes[catalog.kind] = built
+    return snap, built[1]
+
+
+@dataclass(frozen=True)
+class Hit:
+    kind: str
+    score: float
+    row: dict
+
+
+def search_catalogs(db: Session, query: str, kinds: Optional[Sequence[str]] = None) -> List[Hit]:
+    """Ranked hits across the requested catalogs (all by default)."""
+    ranked: List[Tuple[int, float, Hit]] = []
+    for kind in kinds or CATALOGS:
+        snap, index = _index_for(CATALOGS[kind], db)
+        for matched, score, doc_id in index.search(query):
+            ranked.append((matched, score, Hit(kind, score, snap.rows[doc_id])))
+
+    ranked.sort(key=lambda r: (-r[0], -r[1], r[2].kind, r[2].row["id"]))
+    return [r[2] for r in ranked]
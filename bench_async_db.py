@@ -0,0 +1,68 @@
+"""
+Load-test an authenticated GET endpoint with N concurrent clients.
+
+Used to compare requests/sec between the sync (threadpool) and async
+database stacks: run it once against a server built from each revision.
+
+    python bench_async_db.py --token <jwt> --path /api/v1/orders
+    python bench_async_db.py --token <jwt> --path /api/v1/rfqs/market --concurrency 500 --duration 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _client(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            res = await client.get(path)
+            if res.status_code >= 400:
+                errors.append(res.status_code)
+            else:
+                latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def run(base_url: str, path: str, token: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list = []
+    errors: list = []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        # warm-up: fill caches and connection pools before measuring
+        await asyncio.gather(*(client.get(path) for _ in range(min(concurrency, 50))))
+
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _client(client, path, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    ok = len(latencies)
+    print(f"endpoint      : {path}")
+    print(f"concurrency   : {concurrency}")
+    print(f"duration      : {elapsed:.1f}s")
+    print(f"requests ok   : {ok}  errors: {len(errors)}")
+    print(f"requests/sec  : {ok / elapsed:.1f}")
+    if latencies:
+        latencies.sort()
+        print(f"latency p50   : {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"latency p99   : {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/api/v1/orders")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.path, args.token, args.concurrency, args.duration))
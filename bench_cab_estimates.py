@@ -0,0 +1,114 @@
+"""
+Time cab estimates for a batch of pickup/drop pairs (default 1,000).
+
+    single  what the app does today: one /crew/cab/estimate per pair, each
+            pricing every vehicle type into CabEstimate objects.
+    batch   the /crew/cab/estimate/batch path: route_many() + price_matrix()
+            validated once against CabEstimateBatchOut.
+
+Routes use ROAD_GRAPH_PATH when it exists (great-circle fallback otherwise).
+Pass --cold to clear the route cache before each run; by default the runs
+are warm, as on a busy worker. No database or server is needed.
+
+    python bench_cab_estimates.py
+    python bench_cab_estimates.py --pairs 1000 --repeat 5 --cold
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.api.v1.routes_crew import CabEstimate, CabEstimateBatchOut
+from app.services.fares import DEFAULT_PRICING, PricingTable, price_matrix
+from app.services.routing import road_router
+
+# around Mumbai port
+CENTER = (18.94, 72.84)
+SPREAD_DEG = 0.15
+
+
+def _pairs(n: int) -> list:
+    lat, lng = CENTER
+    return [
+        (
+            lat + random.uniform(-SPREAD_DEG, SPREAD_DEG), lng + random.uniform(-SPREAD_DEG, SPREAD_DEG),
+            lat + random.uniform(-SPREAD_DEG, SPREAD_DEG), lng + random.uniform(-SPREAD_DEG, SPREAD_DEG),
+        )
+        for _ in range(n)
+    ]
+
+
+def single(table: PricingTable, pairs: list) -> list:
+    out = []
+    for pair in pairs:
+        route = road_router.route(*pair)
+        out.append([
+            CabEstimate(
+                vehicle_type=table.vehicle_types[i],
+                name=table.names[i],
+                estimated_price=table.price(i, route.distance_km),
+                distance_km=round(route.distance_km, 2),
+                duration_min=round(route.duration_min, 1),
+                route_exact=route.exact,
+                base_fare=table.base_fare[i],
+                per_km_rate=table.per_km_rate[i],
+            )
+            for i in range(len(table))
+        ])
+    return out
+
+
+def batch(table: PricingTable, pairs: list) -> CabEstimateBatchOut:
+    routes = road_router.route_many(pairs)
+    prices = price_matrix(table, [r.distance_km for r in routes])
+    return CabEstimateBatchOut.model_validate({
+        "vehicles": [
+            {
+                "vehicle_type": table.vehicle_types[i],
+                "name": table.names[i],
+                "base_fare": table.base_fare[i],
+                "per_km_rate": table.per_km_rate[i],
+                "minimum_fare": table.minimum_fare[i],
+            }
+            for i in range(len(table))
+        ],
+        "results": [
+            {
+                "distance_km": round(r.distance_km, 2),
+                "duration_min": round(r.duration_min, 1),
+                "route_exact": r.exact,
+                "prices": [column[n] for column in prices],
+            }
+            for n, r in enumerate(routes)
+        ],
+    })
+
+
+def _time(fn, repeat: int, cold: bool) -> float:
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            road_router._cache.clear()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cold", action="store_true", help="empty the route cache before every run")
+    args = parser.parse_args()
+
+    random.seed(0)
+    table = PricingTable.from_rows(0, DEFAULT_PRICING)
+    pairs = _pairs(args.pairs)
+    batch(table, pairs)  # warm-up: loads the graph
+
+    t_single = _time(lambda: single(table, pairs), args.repeat, args.cold)
+    t_batch = _time(lambda: batch(table, pairs), args.repeat, args.cold)
+    stats = road_router.stats()
+    print(f"graph: {stats['nodes']} nodes (contracted: {stats['contracted']}), cache {'cold' if args.cold else 'warm'}")
+    print(f"{args.pairs} pairs   single {t_single * 1000:9.1f} ms   batch {t_batch * 1000:9.1f} ms   ({t_single / t_batch:.1f}x)")
@@ -0,0 +1,69 @@
+"""
+Measure bytes on the wire for a typical app session under each encoding.
+
+Fetches the same set of endpoints once per variant (plain JSON, gzip, br,
+MessagePack + gzip/br) and prints the raw (still-compressed) body sizes,
+as a ship-link user would pay for them.
+
+    python bench_compression.py --token <crew jwt>
+    python bench_compression.py --token <vendor jwt> --path /api/v1/rfqs/market --path /api/v1/orders
+"""
+import argparse
+
+import httpx
+
+CREW_SESSION = [
+    "/api/v1/crew/profile",
+    "/api/v1/crew/shorepass/history",
+    "/api/v1/crew/cab/history",
+    "/api/v1/pubs/",
+    "/api/v1/hotels/",
+    "/api/v1/restaurants/",
+]
+
+VARIANTS = [
+    ("json", "application/json", "identity"),
+    ("json+gzip", "application/json", "gzip"),
+    ("json+br", "application/json", "br"),
+    ("msgpack", "application/msgpack", "identity"),
+    ("msgpack+gzip", "application/msgpack", "gzip"),
+    ("msgpack+br", "application/msgpack", "br"),
+]
+
+
+def wire_bytes(client: httpx.Client, path: str, accept: str, encoding: str) -> tuple:
+    headers = {"Accept": accept, "Accept-Encoding": encoding}
+    with client.stream("GET", path, headers=headers) as res:
+        size = sum(len(chunk) for chunk in res.iter_raw())
+        return res.status_code, size, res.headers.get("content-encoding", "-")
+
+
+def run(base_url: str, token: str, paths: list) -> None:
+    totals = {}
+    with httpx.Client(base_url=base_url, headers={"Authorization": f"Bearer {token}"}, timeout=30) as client:
+        print(f"{'endpoint':<36}" + "".join(f"{name:>14}" for name, _, _ in VARIANTS))
+        for path in paths:
+            row = []
+            for name, accept, encoding in VARIANTS:
+                status, size, applied = wire_bytes(client, path, accept, encoding)
+                if encoding != "identity" and applied != encoding:
+                    size_s = f"{size}*"  # server sent it uncompressed (below threshold or br unavailable)
+                else:
+                    size_s = str(size)
+                row.append(size_s if status < 400 else f"HTTP {status}")
+                totals[name] = totals.get(name, 0) + size
+            print(f"{path:<36}" + "".join(f"{s:>14}" for s in row))
+
+    base = totals["json"] or 1
+    print(f"{'session total':<36}" + "".join(f"{totals[name]:>14}" for name, _, _ in VARIANTS))
+    print(f"{'vs plain json':<36}" + "".join(f"{totals[name] / base:>13.0%} " for name, _, _ in VARIANTS))
+    print("* = response went out uncompressed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--path", action="append", help="endpoint to include (repeatable); default: crew session")
+    args = parser.parse_args()
+    run(args.base_url, args.token, args.path or CREW_SESSION)
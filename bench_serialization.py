@@ -0,0 +1,118 @@
+"""
+Time response serialization for the hotel and restaurant lists, per 1,000 rows.
+
+Compares the old path with the new one:
+
+    before  ORM instances, no response_model. FastAPI falls back to
+            jsonable_encoder, which introspects every SQLAlchemy object
+            attribute by attribute.
+    after   plain row dicts (what the catalog cache holds), validated
+            once against HotelOut / RestaurantOut by pydantic-core, then
+            dumped with the stdlib json encoder.
+    orjson  as "after", rendered by ORJSONResponse (the app default).
+
+No database or server is needed: rows are built in memory.
+
+    python bench_serialization.py
+    python bench_serialization.py --rows 5000 --repeat 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.v1.routes_hotels import HotelOut
+from app.api.v1.routes_restaurants import RestaurantOut
+from app.db.models.hotels import Hotel
+from app.db.models.restaurant import Restaurant
+
+
+def _hotel_row(i: int) -> dict:
+    return {
+        "id": i,
+        "name": f"Hotel {i}",
+        "location": "Nariman Point, Mumbai",
+        "distance_from_port": random.uniform(0.5, 20),
+        "rating": random.uniform(3, 5),
+        "price_per_night": random.uniform(2000, 30000),
+        "phone": "+91 22 6632 5757",
+        "image_url": "https://images.unsplash.com/photo-1566073771259-6a8506099945",
+        "lat": 18.9 + random.random() / 10,
+        "lng": 72.8 + random.random() / 10,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _restaurant_row(i: int) -> dict:
+    return {
+        "id": i,
+        "name": f"Restaurant {i}",
+        "location_name": "Abids, Hyderabad",
+        "distance_from_port": random.uniform(0.5, 20),
+        "rating": random.uniform(3, 5),
+        "price_per_person": random.uniform(100, 1500),
+        "timings": "11am to 11pm",
+        "service_type": "Hyderabadi, Mughlai",
+        "popular_for": ["Biryani", "Haleem (Seasonal)"],
+        "phone": "+91 40 2320 2222",
+        "lat": 17.38 + random.random() / 10,
+        "lng": 78.47 + random.random() / 10,
+        "image_url": "https://images.unsplash.com/photo-1559339352-11d035aa65de",
+        "menu_images": ["https://images.unsplash.com/photo-1626082927389-6cd097cdc6ec"],
+        "description": "Family restaurant known for dum biryani.",
+        "address": "Station Road, Abids",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def bench(label: str, model, schema, make_row, rows: int, repeat: int) -> None:
+    dicts = [make_row(i) for i in range(rows)]
+    orm = [model(**d) for d in dicts]
+    adapter = TypeAdapter(List[schema])
+
+    before = _time(lambda: json.dumps(jsonable_encoder(orm)).encode(), repeat)
+    # same steps FastAPI takes for a response_model: validate, dump, json.dumps
+    after = _time(
+        lambda: json.dumps(adapter.dump_python(adapter.validate_python(dicts), mode="json")).encode(),
+        repeat,
+    )
+    fast = _time(
+        lambda: orjson.dumps(adapter.dump_python(adapter.validate_python(dicts), mode="json")),
+        repeat,
+    )
+
+    per_k = 1000 / rows * 1000
+    print(
+        f"{label:<12} before {before * per_k:8.2f}   after {after * per_k:8.2f}   "
+        f"orjson {fast * per_k:8.2f}  ms/1k rows   ({before / fast:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(0)
+    bench("hotels", Hotel, HotelOut, _hotel_row, args.rows, args.repeat)
+    bench("restaurants", Restaurant, RestaurantOut, _restaurant_row, args.rows, args.repeat)
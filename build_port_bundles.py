@@ -0,0 +1,36 @@
+"""
+Build (or incrementally refresh) the offline port-guide bundles.
+
+Only ports whose catalog rows changed since the last build are rewritten;
+run it after seeding or from a deploy/cron step. The API also refreshes
+bundles lazily when it notices a catalog version change.
+
+    python build_port_bundles.py
+    python build_port_bundles.py --force     # rebuild every port
+"""
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.port_bundles import bundle_store
+
+
+def main(force: bool) -> int:
+    db = SessionLocal()
+    try:
+        results = bundle_store.rebuild(db, force=force)
+    finally:
+        db.close()
+
+    print(f"{'port':<20}{'rows':>7}{'bytes':>10}  {'status':<10}etag")
+    for bundle, rebuilt in results:
+        status = "rebuilt" if rebuilt else "unchanged"
+        print(f"{bundle.port:<20}{bundle.rows:>7}{bundle.size:>10}  {status:<10}{bundle.etag}")
+    print(f"written to {bundle_store.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and rebuild all ports")
+    args = parser.parse_args()
+    raise SystemExit(main(args.force))
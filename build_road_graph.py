@@ -0,0 +1,171 @@
+"""
+Convert an OpenStreetMap .osm (XML) extract into the road graph used for
+cab estimates (app/services/routing.py).
+
+Keeps drivable `highway=*` ways, honours oneway tags, and drops nodes
+that are not on the largest connected road network, so every snapped
+point can reach every other one. Edge times come from `maxspeed` when it
+is numeric, otherwise from a per-highway-class default.
+
+The graph is then contracted for fast queries. Shape points (nodes in the
+middle of a road) contract almost for free; junction-dense city grids
+cost the most, a few minutes for a large city in pure Python. It runs
+once per extract.
+
+    python build_road_graph.py mumbai.osm                 # -> ROAD_GRAPH_PATH
+    python build_road_graph.py mumbai.osm -o data/roads.json.gz
+    python build_road_graph.py mumbai.osm --no-ch         # skip contraction (A* queries)
+
+Export an extract (e.g. a port city's bounding box) from
+https://download.geofabrik.de or the overpass API and convert it as .osm.
+"""
+import argparse
+import gzip
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+import orjson
+
+from app.core.config import settings
+from app.db.migrations import PROJECT_ROOT
+from app.services.geo import haversine_km
+from app.services.routing import Csr, RoadGraph, contract
+
+# km/h when the way has no usable maxspeed
+DEFAULT_SPEEDS = {
+    "motorway": 80, "motorway_link": 50,
+    "trunk": 60, "trunk_link": 40,
+    "primary": 45, "primary_link": 35,
+    "secondary": 35, "secondary_link": 30,
+    "tertiary": 30, "tertiary_link": 25,
+    "unclassified": 25, "residential": 20, "living_street": 10, "service": 15,
+}
+
+
+def _speed(tags: dict) -> float:
+    match = re.match(r"\s*(\d+(?:\.\d+)?)\s*(mph)?", tags.get("maxspeed", ""))
+    if match:
+        kmh = float(match.group(1)) * (1.609 if match.group(2) else 1.0)
+        if kmh > 0:
+            return kmh
+    return DEFAULT_SPEEDS[tags["highway"]]
+
+
+def _oneway(tags: dict) -> int:
+    """1 forward only, -1 reverse only, 0 both ways."""
+    value = tags.get("oneway", "")
+    if value in ("yes", "true", "1"):
+        return 1
+    if value == "-1":
+        return -1
+    if value == "no":
+        return 0
+    return 1 if tags.get("junction") == "roundabout" or tags["highway"] == "motorway" else 0
+
+
+def parse_osm(path: str):
+    coords = {}
+    ways = []
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "node":
+            coords[int(elem.get("id"))] = (float(elem.get("lat")), float(elem.get("lon")))
+            elem.clear()
+        elif elem.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+            if tags.get("highway") in DEFAULT_SPEEDS and tags.get("access") not in ("no", "private"):
+                ways.append(([int(nd.get("ref")) for nd in elem.iter("nd")], tags))
+            elem.clear()
+    return coords, ways
+
+
+def _largest_component(n: int, edges) -> set:
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v, _, _ in edges:
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+    sizes = defaultdict(int)
+    for i in range(n):
+        sizes[find(i)] += 1
+    root = max(sizes, key=sizes.get)
+    return {i for i in range(n) if find(i) == root}
+
+
+def build_graph(coords: dict, ways, with_ch: bool = True) -> RoadGraph:
+    index = {}
+    edges = []  # (u, v, time_s, length_m)
+
+    def node(osm_id):
+        if osm_id not in index:
+            index[osm_id] = len(index)
+        return index[osm_id]
+
+    for refs, tags in ways:
+        refs = [r for r in refs if r in coords]
+        mps = _speed(tags) / 3.6
+        direction = _oneway(tags)
+        for a, b in zip(refs, refs[1:]):
+            meters = haversine_km(*coords[a], *coords[b]) * 1000.0
+            u, v = node(a), node(b)
+            if direction >= 0:
+                edges.append((u, v, meters / mps, meters))
+            if direction <= 0:
+                edges.append((v, u, meters / mps, meters))
+
+    ids = [None] * len(index)
+    for osm_id, i in index.items():
+        ids[i] = osm_id
+    keep = sorted(_largest_component(len(ids), edges))
+    remap = {old: new for new, old in enumerate(keep)}
+
+    adj = [{} for _ in keep]
+    kept_edges = []
+    for u, v, seconds, meters in edges:
+        if u in remap and v in remap and u != v:
+            u, v = remap[u], remap[v]
+            if v not in adj[u] or seconds < adj[u][v][0]:
+                adj[u][v] = (seconds, meters)
+            kept_edges.append((u, v, seconds, meters))
+
+    up = down = None
+    if with_ch:
+        started = time.perf_counter()
+        up, down = contract(len(keep), kept_edges)
+        print(f"contracted in {time.perf_counter() - started:.0f} s: {len(up.targets) + len(down.targets)} edges")
+    return RoadGraph(
+        [coords[ids[i]][0] for i in keep],
+        [coords[ids[i]][1] for i in keep],
+        Csr.from_adjacency(adj),
+        up,
+        down,
+    )
+
+
+def main(source: str, output: str, with_ch: bool) -> int:
+    coords, ways = parse_osm(source)
+    graph = build_graph(coords, ways, with_ch)
+    path = output if os.path.isabs(output) else os.path.join(PROJECT_ROOT, output)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(gzip.compress(orjson.dumps(graph.to_dict()), mtime=0))
+    print(f"{len(graph)} nodes, {len(graph.base.targets)} edges -> {path} ({os.path.getsize(path)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help=".osm XML extract")
+    parser.add_argument("-o", "--output", default=settings.ROAD_GRAPH_PATH)
+    parser.add_argument("--no-ch", action="store_true", help="skip contraction hierarchies")
+    args = parser.parse_args()
+    raise SystemExit(main(args.source, args.output, not args.no_ch))
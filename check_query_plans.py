@@ -0,0 +1,152 @@
+"""
+EXPLAIN-based regression check for the hot endpoint queries.
+
+Seeds a throwaway dataset inside a transaction (rolled back at the end),
+ANALYZEs it, then EXPLAINs the same SELECTs the endpoints issue. Exits
+non-zero if any of them falls back to a sequential scan on the filtered
+table, e.g. after an index was dropped or a query changed shape.
+
+    python check_query_plans.py            # default: 20k rows per table
+    python check_query_plans.py --rows 50000
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.db.session import SessionLocal
+from app.db.models.user import User
+from app.db.models.vendor_profile import VendorProfile
+from app.db.models.crew_profile import CrewProfile
+from app.db.models.rfq import RFQ
+from app.db.models.rfq_quote import RFQQuote
+from app.db.models.order import Order
+from app.db.models.shore_pass import ShorePass
+from app.db.models.cab_booking import CabBooking, VehicleType, BookingStatus
+
+PORTS = [f"port_{i}" for i in range(50)]
+USERS = 500
+TAG = "qplan"  # marks seeded rows (all rolled back anyway)
+
+
+def seed(db, rows: int):
+    now = datetime.utcnow()
+    base_id = db.scalar(select(User.id).order_by(User.id.desc()).limit(1)) or 0
+
+    user_ids = list(range(base_id + 1, base_id + 1 + USERS))
+    db.execute(insert(User), [
+        {"id": uid, "email": f"{TAG}{uid}@example.test", "hashed_password": "x", "role": "vendor"}
+        for uid in user_ids
+    ])
+    vendor_id, crew_user_id = user_ids[0], user_ids[1]
+    db.execute(insert(VendorProfile), [{"user_id": vendor_id, "company_name": TAG, "ports_served": PORTS[:2]}])
+    crew_id = db.execute(insert(CrewProfile).returning(CrewProfile.id), [{
+        "user_id": crew_user_id, "full_name": TAG, "rank": "AB", "nationality": "IN",
+        "passport_number": TAG, "date_of_birth": date(1990, 1, 1),
+    }]).scalar_one()
+
+    rfq_ids = db.execute(insert(RFQ).returning(RFQ.id), [
+        {"title": TAG, "buyer_company": TAG, "port": PORTS[i % len(PORTS)],
+         "user_id": user_ids[i % USERS], "required_items": [], "tags": [], "terms": {}}
+        for i in range(rows)
+    ]).scalars().all()
+    quote_ids = db.execute(insert(RFQQuote).returning(RFQQuote.id), [
+        {"rfq_id": rfq_id, "vendor_user_id": user_ids[i % USERS], "items": []}
+        for i, rfq_id in enumerate(rfq_ids)
+    ]).scalars().all()
+    db.execute(insert(Order), [
+        {"order_number": f"{TAG}-{rfq_id}", "rfq_id": rfq_id, "quote_id": quote_id,
+         "buyer_user_id": user_ids[i % USERS], "vendor_user_id": user_ids[(i + 7) % USERS],
+         "items": [], "status": ("confirmed", "processing", "fulfilled", "cancelled")[i % 4]}
+        for i, (rfq_id, quote_id) in enumerate(zip(rfq_ids, quote_ids))
+    ])
+
+    # other crew members' history so the crew filter is selective
+    crew_ids = [crew_id] + db.execute(insert(CrewProfile).returning(CrewProfile.id), [{
+        "user_id": uid, "full_name": TAG, "rank": "AB", "nationality": "IN",
+        "passport_number": TAG, "date_of_birth": date(1990, 1, 1),
+    } for uid in user_ids[2:200]]).scalars().all()
+    db.execute(insert(ShorePass), [
+        {"crew_profile_id": crew_ids[i % len(crew_ids)], "shore_pass_id": f"{TAG}-{i}",
+         "created_at": now - timedelta(minutes=i)}
+        for i in range(rows)
+    ])
+    db.execute(insert(CabBooking), [
+        {"booking_id": f"{TAG}-{i}", "crew_id": crew_ids[i % len(crew_ids)],
+         "pickup_address": TAG, "pickup_lat": 0, "pickup_lng": 0,
+         "drop_address": TAG, "drop_lat": 0, "drop_lng": 0,
+         "vehicle_type": VehicleType.AC, "vehicle_name": TAG, "estimated_price": 1,
+         "distance_km": 1, "num_passengers": 1, "otp": "0000", "status": BookingStatus.PENDING,
+         "created_at": now - timedelta(minutes=i), "updated_at": now}
+        for i in range(rows)
+    ])
+    for table in ("users", "rfqs", "rfq_quotes", "orders", "crew_profiles", "shore_passes", "cab_bookings"):
+        db.execute(text(f"ANALYZE {table}"))
+    return vendor_id, crew_id, user_ids
+
+
+def endpoint_queries(vendor_id: int, crew_id: int, user_ids):
+    """(label, table that must not be seq-scanned, statement) mirroring the routers."""
+    buyer_id = user_ids[3]
+    return [
+        ("vendor_market / list_rfqs(vendor)", "rfqs",
+         select(RFQ).where(RFQ.port.in_(PORTS[:2])).order_by(RFQ.id.desc())),
+        ("list_orders(shipping_company)", "orders",
+         select(Order).where(Order.buyer_user_id == buyer_id).order_by(Order.id.desc())),
+        ("list_orders(vendor)", "orders",
+         select(Order).where(Order.vendor_user_id == vendor_id).order_by(Order.id.desc())),
+        ("list_orders(vendor, status)", "orders",
+         select(Order).where(Order.vendor_user_id == vendor_id, Order.status == "processing").order_by(Order.id.desc())),
+        ("list_my_quotes", "rfq_quotes",
+         select(RFQQuote).where(RFQQuote.vendor_user_id == vendor_id).order_by(RFQQuote.id.desc())),
+        ("get_current_shorepass", "shore_passes",
+         select(ShorePass).where(ShorePass.crew_profile_id == crew_id).order_by(ShorePass.created_at.desc()).limit(1)),
+        ("get_shorepass_history", "shore_passes",
+         select(ShorePass).where(ShorePass.crew_profile_id == crew_id).order_by(ShorePass.created_at.desc())),
+        ("get_booking_history", "cab_bookings",
+         select(CabBooking).where(CabBooking.crew_id == crew_id).order_by(CabBooking.created_at.desc())),
+    ]
+
+
+def _seq_scans(plan: dict):
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+def main(rows: int) -> int:
+    db = SessionLocal()
+    failures = 0
+    try:
+        vendor_id, crew_id, user_ids = seed(db, rows)
+        for label, table, stmt in endpoint_queries(vendor_id, crew_id, user_ids):
+            sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scanned = set(_seq_scans(plan[0]["Plan"]))
+            if table in scanned:
+                failures += 1
+                print(f"❌ {label}: sequential scan on {table}")
+            else:
+                print(f"✅ {label}")
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"{failures} endpoint queries fell back to a sequential scan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    sys.exit(main(parser.parse_args().rows))
@@ -1,5 +1,6 @@
 from app.db.base import Base
 from app.db.session import engine
+from app.db.migrations import alembic_config, current_revisions
 
 def create_tables():
     """Create all tables in the database"""
@@ -18,6 +19,14 @@ def create_tables():
         inspector = inspect(engine)
         tables = inspector.get_table_names()
         print(f"Created tables: {tables}")
+
+        # A brand-new database is now at the latest schema: stamp it so the
+        # API's startup check (DB_STARTUP_MODE=check) accepts it. Existing
+        # databases must go through `alembic upgrade head` instead.
+        if current_revisions(engine) is None:
+            from alembic import command
+            command.stamp(alembic_config(), "head")
+            print("✅ Stamped fresh database at alembic head")
         
     except Exception as e:
         print(f"❌ Error creating tables: {e}")
@@ -0,0 +1,95 @@
+import gzip
+import json
+
+import msgpack
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, no_compression
+
+MIN_BYTES = 500
+ROWS = [{"id": i, "name": f"row {i}", "rating": 4.5} for i in range(200)]
+
+# Same layering as app.main: an @app.middleware("http") layer (which
+# re-streams every body in chunks) inside the compression middleware.
+app = FastAPI(default_response_class=ORJSONResponse)
+
+
+@app.middleware("http")
+async def passthrough(request: Request, call_next):
+    return await call_next(request)
+
+
+app.add_middleware(CompressionMiddleware, minimum_size=MIN_BYTES)
+
+
+@app.get("/small")
+def small():
+    return {"status": "healthy"}
+
+
+@app.get("/rows")
+def rows():
+    return ROWS
+
+
+@app.get("/stream")
+def stream():
+    def chunks():
+        yield b"["
+        for i, row in enumerate(ROWS):
+            yield (b"," if i else b"") + json.dumps(row).encode()
+        yield b"]"
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+@app.get("/raw")
+@no_compression
+def raw():
+    return ROWS
+
+
+client = TestClient(app)
+
+
+def test_msgpack_negotiated():
+    res = client.get("/small", headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/msgpack"
+    assert "Accept" in res.headers["vary"]
+    assert msgpack.unpackb(res.content) == {"status": "healthy"}
+
+
+def test_small_response_not_compressed():
+    res = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+    assert res.json() == {"status": "healthy"}
+
+
+def test_large_json_gzipped():
+    res = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert res.json() == ROWS  # httpx decodes the gzip body
+
+
+def test_large_json_as_gzipped_msgpack():
+    res = client.get("/rows", headers={"Accept": "application/msgpack", "Accept-Encoding": "gzip"})
+    assert res.headers["content-type"] == "application/msgpack"
+    assert res.headers["content-encoding"] == "gzip"
+    assert msgpack.unpackb(res.content) == ROWS
+
+
+def test_streaming_response_compressed():
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as res:
+        raw_body = b"".join(res.iter_raw())
+    assert res.headers["content-encoding"] == "gzip"
+    assert "content-length" not in res.headers
+    assert json.loads(gzip.decompress(raw_body)) == ROWS
+
+
+def test_opted_out_route_left_alone():
+    res = client.get("/raw", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+    assert res.json() == ROWS
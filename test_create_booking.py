@@ -1,7 +1,7 @@
 
 from fastapi.testclient import TestClient
 from app.main import app
-from app.api.v1.routes_auth import get_current_user
+from app.api.v1.deps import get_current_user
 from app.db.models.user import User
 from app.db.models.crew_profile import CrewProfile
 from app.db.session import get_db
@@ -16,7 +16,12 @@ app.dependency_overrides[get_current_user] = override_get_current_user
 client = TestClient(app)
 
 def test_create_and_check_booking():
-    # 1. Create a dummy booking
+    # 1. Get a signed quote, then create a dummy booking with it
+    estimates = client.get(
+        "/api/v1/crew/cab/estimate",
+        params={"pickup_lat": 17.0, "pickup_lng": 83.0, "drop_lat": 17.1, "drop_lng": 83.1},
+    ).json()
+    quote = next(e for e in estimates if e["vehicle_type"] == "ac")
     payload = {
         "pickup_address": "Test Pickup",
         "pickup_lat": 17.0,
@@ -26,12 +31,11 @@ def test_create_and_check_booking():
         "drop_lng": 83.1,
         "vehicle_type": "ac",
         "vehicle_name": "Cab AC",
-        "estimated_price": 427.50,
-        "distance_km": 10.0,
+        "fare_token": quote["fare_token"],
         "num_passengers": 1
     }
     
-    print("Sending payload with estimated_price: 427.50")
+    print(f"Sending payload with quoted price: {quote['estimated_price']}")
     response = client.post("/api/v1/crew/cab/book", json=payload)
     
     if response.status_code != 200:
@@ -56,7 +60,7 @@ def test_create_and_check_booking():
     details = response.json()
     print(f"Fetched details: Estimated Price = {details.get('estimated_price')}, Type: {type(details.get('estimated_price'))}")
     
-    if details.get('estimated_price') == 427.5:
+    if details.get('estimated_price') == quote['estimated_price']:
         print("SUCCESS: Price saved and retrieved correctly.")
     else:
         print("FAILURE: Price mismatch.")
@@ -0,0 +1,72 @@
+import time
+
+from app.core.config import settings
+from app.services.dispatch import Dispatcher, Driver, DriverIndex, PendingBooking
+
+
+class MemoryDispatcher(Dispatcher):
+    """Dispatcher over an in-memory pending queue (id order stands in for created_at)."""
+
+    def __init__(self, index, bookings):
+        super().__init__(index)
+        self.queue = {b.id: b for b in bookings}
+
+    def _pending(self, db, limit, after=None):
+        start = after.id if after is not None else 0
+        return [b for b in sorted(self.queue.values(), key=lambda b: b.id) if b.id > start][:limit]
+
+    def _assign(self, db, assignments):
+        for a in assignments:
+            del self.queue[a.booking_id]
+        return {a.booking_id for a in assignments}
+
+
+def _driver(driver_id="drv-1", lat=18.94, lng=72.84, vehicle_type="ac"):
+    return Driver(driver_id, "Driver", "+91 9000000000", vehicle_type, 4, lat, lng, time.monotonic())
+
+
+def _booking(booking_id, vehicle_type="ac"):
+    return PendingBooking(booking_id, vehicle_type, 1, 18.94, 72.84)
+
+
+def test_assigned_driver_not_readded_by_position_push():
+    index = DriverIndex()
+    index.upsert(_driver())
+    dispatcher = MemoryDispatcher(index, [_booking(1), _booking(2)])
+
+    assert dispatcher.run_once(None).assigned == 1
+    # the fleet feed keeps reporting the driver's position during the trip
+    assert index.upsert_many([_driver(lat=18.95)]) == 0
+    assert len(index) == 0 and index.busy_count == 1
+    assert dispatcher.run_once(None).assigned == 0
+    assert list(dispatcher.queue) == [2]
+
+    # trip over: the next position makes the driver available again
+    assert index.release("drv-1")
+    index.upsert(_driver(lat=18.95))
+    assert dispatcher.run_once(None).assigned == 1
+    assert not dispatcher.queue
+
+
+def test_unservable_batch_does_not_starve_queue(monkeypatch):
+    monkeypatch.setattr(settings, "DISPATCH_BATCH_SIZE", 2)
+    index = DriverIndex()
+    index.upsert_many([_driver("drv-1"), _driver("drv-2")])
+    # the two oldest bookings want an XL and there is none
+    dispatcher = MemoryDispatcher(index, [_booking(1, "xl"), _booking(2, "xl"), _booking(3)])
+
+    first = dispatcher.run_once(None)
+    assert (first.pending, first.assigned) == (2, 0)
+    assert dispatcher.run_once(None).assigned == 1
+    assert sorted(dispatcher.queue) == [1, 2]
+    # past the end of the queue the next round starts over from the oldest
+    assert dispatcher.run_once(None).pending == 2
+
+
+def test_removed_driver_forgets_busy_mark():
+    index = DriverIndex()
+    index.upsert(_driver())
+    assert index.reserve("drv-1") is not None
+    index.remove("drv-1")  # off shift mid-trip
+    assert index.busy_count == 0
+    assert index.upsert(_driver())